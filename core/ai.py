@@ -1,54 +1,313 @@
 # core/ai.py
-import os, re, json
+import os, re, json, time, hashlib, asyncio, threading
+from concurrent.futures import Future
 from typing import Any, Dict, List, Optional
 
+from core import store
+
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except Exception:
     OpenAI = None
+    AsyncOpenAI = None
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
 
 _DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+INSIGHTS_PATH = "/ai/insights"  # entrada do cache em disco (core/store.py)
+INSIGHTS_TTL = 7 * 24 * 3600    # teto de idade; a chave já muda quando jogos/estatísticas mudam
+HEDGE_AFTER = 15.0  # s: teto da latência normal; acima disso vale disparar o fallback (opt-in)
+# teto de tokens da parte variável do contexto; as seções estáveis (STABLE_KEYS,
+# prefixo do cache de prompt) só viram resumo e nunca são cortadas
+CONTEXT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKENS", "1500"))
+
+# ordem de importância das seções do contexto (as últimas encolhem/saem primeiro)
+SECTION_PRIORITY = [
+    "mode", "user_focus", "team", "opponent", "match", "next_fixture", "standings_rank",
+    "recent_summary", "simple_poisson", "stats", "team_stats", "opp_stats",
+    "last_games", "last_games_team", "last_games_opp", "head_to_head", "league", "season",
+]
+STATS_KEYS = ("stats", "team_stats", "opp_stats")
+LIST_KEYS = ("last_games", "last_games_team", "last_games_opp", "head_to_head")
 
 class AIError(Exception):
     pass
 
 # ------------------------------- utils -------------------------------
 
-def _make_client() -> OpenAI:
+# clientes por processo (pool de conexões HTTP reaproveitado entre chamadas)
+_clients: Dict[tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+def _client(kind: str):
     if OpenAI is None:
         raise AIError("Pacote openai>=1.0 não está instalado.")
-    if not os.getenv("OPENAI_API_KEY"):
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
         raise AIError("OPENAI_API_KEY não definida no ambiente.")
-    return OpenAI()
-
-def _build_system_prompt(mode: str) -> str:
-    base = ("Você é um analista de dados/tático do Coritiba. "
-            "Produza **cartões de insight** em pt-BR, concisos e acionáveis. ")
-    if mode == "pre_match":
-        base += "Foco em pré-jogo: forças, fragilidades, riscos e ações. "
-    elif mode == "freeform":
-        base += "Responda à pergunta do usuário como cartões. "
-    else:
-        base += "Gere 3–6 cartões automáticos a partir do contexto. "
-    base += "Sempre explique por que importa e recomende uma ação."
-    return base
+    key = (kind, api_key)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = OpenAI() if kind == "sync" else AsyncOpenAI()
+        return _clients[key]
+
+def _make_client() -> OpenAI:
+    return _client("sync")
+
+def _make_async_client() -> "AsyncOpenAI":
+    """Só dentro do loop de _ai_loop() (o cliente assíncrono fica preso a ele)."""
+    return _client("async")
+
+# loop assíncrono do processo: roda os jobs de IA em paralelo sem bloquear o script
+_loop = None
+_loop_lock = threading.Lock()
+
+def _ai_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="ai-loop", daemon=True).start()
+        return _loop
+
+# ------------------------ montagem do prompt -------------------------
+# Ordem fixa para o cache de prompt do provedor reaproveitar o prefixo:
+#   1) system (instruções + schema, byte a byte igual em toda chamada)
+#   2) contexto da temporada (muda só quando termina um jogo)
+#   3) modo + contexto do momento (o que varia por pedido) — sempre por último
+# A OpenAI só cacheia prefixos a partir de PROMPT_CACHE_MIN_TOKENS. Com o
+# contexto compactado, o prefixo típico (system + temporada) fica abaixo
+# disso: cached_tokens sai 0 e a ordem só passa a render quando o prefixo
+# cresce. context_report() mostra o tamanho do prefixo; usage_stats() conta
+# as chamadas abaixo do limite.
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+INSIGHTS_SCHEMA = (
+    '{"insights":[{"type":"trend","title":"...","summary":"...","why_it_matters":"...",'
+    '"recommended_action":"...","timeframe":"", "severity":"low|medium|high", '
+    '"confidence":0.0, "evidence":[{"label":"...","value":0,"baseline":0,"unit":""}]}]}'
+)
+
+SYSTEM_PROMPT = (
+    "Você é um analista de dados/tático do Coritiba. "
+    "Produza **cartões de insight** em pt-BR, concisos e acionáveis. "
+    "Sempre explique por que importa e recomende uma ação. "
+    "O modo do pedido vem na última mensagem: "
+    "auto = 3–6 cartões automáticos a partir do contexto; "
+    "pre_match = foco em pré-jogo: forças, fragilidades, riscos e ações; "
+    "freeform = responda à pergunta do usuário (user_focus) como cartões.\n"
+    "Responda **apenas** com JSON válido no formato:\n" + INSIGHTS_SCHEMA
+)
+
+# seções de nível de temporada (estáveis entre pedidos do mesmo dia de jogo)
+STABLE_KEYS = ("season", "league", "team", "stats", "team_stats", "recent_summary")
+
+def _dumps(obj) -> str:
+    """Serialização determinística (chaves ordenadas, sem espaços): mesmo dado = mesmos bytes."""
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+def _prompt_messages(mode: str, ctx: dict, strict_json: bool = True) -> List[dict]:
+    stable = {k: ctx[k] for k in STABLE_KEYS if k in ctx}
+    volatile = {k: v for k, v in ctx.items() if k not in STABLE_KEYS and k != "mode"}
+    rule = ("Responda apenas com o JSON." if strict_json
+            else "Retorne **apenas** JSON no formato informado (sem texto extra).")
+    return [
+        {"role":"system","content":SYSTEM_PROMPT},
+        {"role":"user","content":"Contexto da temporada:\n" + _dumps(stable)},
+        {"role":"user","content":f"Modo: {mode}. {rule}\nContexto do momento:\n" + _dumps(volatile)},
+    ]
+
+# ---------------------- uso de tokens (cache de prompt) ---------------
+_usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+          "latency_s": 0.0, "calls_with_cache": 0, "latency_with_cache_s": 0.0,
+          "calls_below_cache_min": 0}
+_usage_lock = threading.Lock()
+
+def _record_usage(usage, latency: float):
+    """Soma o `usage` devolvido pela API (inclui prompt_tokens_details.cached_tokens)."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    with _usage_lock:
+        _usage["calls"] += 1
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        _usage["prompt_tokens"] += prompt_tokens
+        if prompt_tokens < PROMPT_CACHE_MIN_TOKENS:
+            _usage["calls_below_cache_min"] += 1  # prompt curto demais para o cache do provedor
+        _usage["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+        _usage["cached_tokens"] += cached
+        _usage["latency_s"] += latency
+        if cached:
+            _usage["calls_with_cache"] += 1
+            _usage["latency_with_cache_s"] += latency
+
+def usage_stats() -> Dict[str, Any]:
+    """Tokens/latência das chamadas deste processo e quanto do prompt veio do cache do provedor."""
+    with _usage_lock:
+        u = dict(_usage)
+    u["cached_ratio"] = round(u["cached_tokens"] / u["prompt_tokens"], 3) if u["prompt_tokens"] else 0.0
+    u["avg_latency_s"] = round(u["latency_s"] / u["calls"], 2) if u["calls"] else None
+    u["avg_latency_with_cache_s"] = (round(u["latency_with_cache_s"] / u["calls_with_cache"], 2)
+                                     if u["calls_with_cache"] else None)
+    return u
 
 def _tail(lst, n): 
     return list(lst)[-n:] if isinstance(lst, list) else lst
 
-def _truncate_context(ctx: Dict[str, Any]) -> Dict[str, Any]:
-    c = dict(ctx)
-    for k in ["last_games","last_games_team","last_games_opp","head_to_head"]:
-        if k in c:
-            c[k] = _tail(c[k], 10)
-    for key in ["stats","team_stats","opp_stats"]:
-        if key in c and isinstance(c[key], dict):
-            s = c[key].copy()
-            for big in ["fixtures","biggest","lineups","cards"]:
-                s.pop(big, None)
-            c[key] = s
+# ----------------------- compactação do contexto ----------------------
+
+def _count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Tokens de um texto (tiktoken se instalado; senão ~4 caracteres por token)."""
+    if tiktoken is not None:
+        try:
+            try:
+                enc = tiktoken.encoding_for_model(model or _DEFAULT_MODEL)
+            except KeyError:
+                enc = tiktoken.get_encoding("o200k_base")
+            return len(enc.encode(text))
+        except Exception:
+            pass
+    return max(1, len(text) // 4)
+
+def _section_tokens(value, model: Optional[str] = None) -> int:
+    return _count_tokens(json.dumps(value, ensure_ascii=False, default=str), model)
+
+def _drop_urls(obj):
+    """Remove logos/fotos (URLs não ajudam a IA e custam muitos tokens)."""
+    if isinstance(obj, dict):
+        return {k: _drop_urls(v) for k, v in obj.items()
+                if not (isinstance(v, str) and v.startswith("http"))}
+    if isinstance(obj, list):
+        return [_drop_urls(v) for v in obj]
+    return obj
+
+def _dig(d, *keys):
+    for k in keys:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(k)
+    return d
+
+def _summarize_team_stats(block) -> Dict[str, Any]:
+    """
+    Resumo compacto do /teams/statistics: números que a IA usa (campanha,
+    médias de gols, distribuição por minuto, clean sheets, pênaltis, formação
+    mais usada, cartões) no lugar do bloco bruto.
+    """
+    if isinstance(block, dict) and "response" in block:
+        block = block.get("response")  # envelope da API ({"get", "parameters", ..., "response"})
+    if isinstance(block, list):
+        block = block[0] if block else {}
+    if not isinstance(block, dict) or not block:
+        return {}
+    g = _dig
+    fx = block.get("fixtures") or {}
+    goals = block.get("goals") or {}
+
+    def minutes(side):
+        out = {}
+        for bucket, v in (g(goals, side, "minute") or {}).items():
+            if isinstance(v, dict) and v.get("total"):
+                out[bucket] = v.get("total")
+        return out
+
+    def cards(color):
+        return sum((v or {}).get("total") or 0 for v in (g(block, "cards", color) or {}).values())
+
+    lineups = sorted(block.get("lineups") or [], key=lambda l: l.get("played") or 0, reverse=True)
+    return {
+        "form_last10": (block.get("form") or "")[-10:],
+        "played": {s: g(fx, "played", s) for s in ("home", "away", "total")},
+        "wins": g(fx, "wins", "total"), "draws": g(fx, "draws", "total"), "loses": g(fx, "loses", "total"),
+        "goals_for_avg": g(goals, "for", "average"),
+        "goals_against_avg": g(goals, "against", "average"),
+        "goals_for_by_minute": minutes("for"),
+        "goals_against_by_minute": minutes("against"),
+        "clean_sheets": g(block, "clean_sheet", "total"),
+        "failed_to_score": g(block, "failed_to_score", "total"),
+        "penalties": {"scored": g(block, "penalty", "scored", "total"),
+                      "missed": g(block, "penalty", "missed", "total")},
+        "streak": g(block, "biggest", "streak"),
+        "main_formation": lineups[0].get("formation") if lineups else None,
+        "cards": {"yellow": cards("yellow"), "red": cards("red")},
+    }
+
+def _has_values(obj) -> bool:
+    """True se algum campo do resumo veio preenchido (não None/vazio)."""
+    if isinstance(obj, dict):
+        return any(_has_values(v) for v in obj.values())
+    if isinstance(obj, list):
+        return any(_has_values(v) for v in obj)
+    return obj not in (None, "", 0)
+
+def _shrink(ctx: Dict[str, Any], key: str):
+    """Encolhe uma seção um passo (lista pela metade, mínimo 3; depois remove)."""
+    val = ctx.get(key)
+    if isinstance(val, list) and len(val) > 3:
+        ctx[key] = val[-max(3, len(val) // 2):]
+    else:
+        ctx.pop(key, None)
+
+def _compact_context(ctx: Dict[str, Any], budget: int, model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Cabe o contexto em `budget` tokens: blocos de estatística viram resumo,
+    URLs saem, e as seções de menor prioridade encolhem/saem primeiro. As
+    seções estáveis (STABLE_KEYS) não entram no corte — assim o prefixo do
+    prompt é o mesmo entre pedidos — e não contam no budget.
+    """
+    c = _drop_urls(dict(ctx))
+    for key in STATS_KEYS:
+        if key in c:
+            summary = _summarize_team_stats(c[key])
+            # formato inesperado (resumo todo vazio): mantém o bloco original
+            if _has_values(summary):
+                c[key] = summary
+    for key in LIST_KEYS:
+        if key in c:
+            c[key] = _tail(c[key], 10)
+
+    rank = {k: i for i, k in enumerate(SECTION_PRIORITY)}
+    cost = {k: _section_tokens(v, model) for k, v in c.items()}
+    protected = {"mode", "user_focus", *STABLE_KEYS}
+    while sum(v for k, v in cost.items() if k not in protected) > budget:
+        # seção menos importante (desconhecidas contam como baixa prioridade)
+        victims = [k for k in c if k not in protected]
+        if not victims:
+            break
+        key = max(victims, key=lambda k: (rank.get(k, len(rank)), cost[k]))
+        _shrink(c, key)
+        if key in c:
+            cost[key] = _section_tokens(c[key], model)
+        else:
+            cost.pop(key, None)
     return c
 
+def _truncate_context(ctx: Dict[str, Any], budget: Optional[int] = None) -> Dict[str, Any]:
+    return _compact_context(ctx, budget or CONTEXT_TOKEN_BUDGET)
+
+def _prefix_tokens(ctx: Dict[str, Any]) -> int:
+    """Tokens do prefixo estável do prompt (system + contexto da temporada)."""
+    return sum(_count_tokens(m["content"]) for m in _prompt_messages("auto", ctx)[:2])
+
+def context_report(context: Dict[str, Any], budget: Optional[int] = None) -> Dict[str, Any]:
+    """Tokens do contexto bruto × compactado, por seção (para o debug das páginas)."""
+    compact = _truncate_context(context, budget)
+    return {
+        "budget": budget or CONTEXT_TOKEN_BUDGET,
+        "tokenizer": "tiktoken" if tiktoken is not None else "chars/4",
+        "raw_tokens": _section_tokens(context),
+        "compact_tokens": _section_tokens(compact),
+        "prefix_tokens": _prefix_tokens(compact),
+        "prefix_cacheable": _prefix_tokens(compact) >= PROMPT_CACHE_MIN_TOKENS,
+        "volatile_tokens": sum(_section_tokens(v) for k, v in compact.items()
+                               if k not in STABLE_KEYS and k not in ("mode", "user_focus")),
+        "sections": {k: _section_tokens(v) for k, v in compact.items()},
+    }
+
 def _extract_json(text: str) -> dict:
     if not text:
         raise AIError("Resposta vazia do modelo.")
@@ -82,41 +341,167 @@ def _normalize_cards(cards: List[dict], max_cards: int) -> List[dict]:
         })
     return out
 
-# --------------------------- chamadas de IA ---------------------------
+# ------------------------- cache de respostas -------------------------
 
-def _chat_json_object(client: OpenAI, model: str, system: str, ctx: dict) -> dict:
-    """Primeira tentativa: Chat Completions com JSON obrigatório."""
-    prompt = (
-        "Responda **apenas** com JSON válido no formato:\n"
-        '{"insights":[{"type":"trend","title":"...","summary":"...","why_it_matters":"...",'
-        '"recommended_action":"...","timeframe":"", "severity":"low|medium|high", '
-        '"confidence":0.0, "evidence":[{"label":"...","value":0,"baseline":0,"unit":""}]}]}\n\n'
-        "Contexto:\n" + json.dumps(ctx, ensure_ascii=False)
+def _insights_key(mode: str, model: str, ctx: dict, max_cards: int) -> str:
+    """Hash estável do pedido: mesmo contexto (após truncar) = mesma resposta."""
+    raw = json.dumps(
+        {"mode": mode, "model": model, "ctx": ctx, "max_cards": max_cards},
+        sort_keys=True, ensure_ascii=False, default=str,
     )
-    resp = client.chat.completions.create(
+    return "ai:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _cached_insights(key: str) -> Optional[List[dict]]:
+    hit = store.get(key)
+    if hit and time.time() - hit["fetched_at"] < INSIGHTS_TTL:
+        return hit["data"]
+    return None
+
+def _save_insights(key: str, mode: str, model: str, max_cards: int, cards: List[dict]):
+    if cards:  # resposta vazia não vale a pena guardar
+        store.put(key, INSIGHTS_PATH, {"mode": mode, "model": model, "max_cards": max_cards}, cards)
+
+# --------------------------- chamadas de IA ---------------------------
+
+async def _achat_json_object(client, model: str, mode: str, ctx: dict) -> dict:
+    t0 = time.perf_counter()
+    resp = await client.chat.completions.create(
         model=model,
-        messages=[{"role":"system","content":system},
-                  {"role":"user","content":prompt}],
+        messages=_prompt_messages(mode, ctx),
         response_format={"type":"json_object"},
         temperature=0.2,
     )
-    text = (resp.choices[0].message.content or "").strip()
-    return _extract_json(text)
-
-def _chat_plain_json(client: OpenAI, model: str, system: str, ctx: dict) -> dict:
-    """Fallback: Chat Completions sem response_format, parseando o JSON do texto."""
-    prompt = (
-        "Retorne **apenas** JSON no formato informado (sem texto extra). "
-        "Contexto:\n" + json.dumps(ctx, ensure_ascii=False)
+    _record_usage(getattr(resp, "usage", None), time.perf_counter() - t0)
+    return _extract_json((resp.choices[0].message.content or "").strip())
+
+async def _achat_plain_json(client, model: str, mode: str, ctx: dict) -> dict:
+    t0 = time.perf_counter()
+    resp = await client.chat.completions.create(
+        model=model,
+        messages=_prompt_messages(mode, ctx, strict_json=False),
+        temperature=0.2,
     )
-    resp = client.chat.completions.create(
+    _record_usage(getattr(resp, "usage", None), time.perf_counter() - t0)
+    return _extract_json((resp.choices[0].message.content or "").strip())
+
+async def _afetch_payload(client, model: str, mode: str, ctx: dict,
+                          hedge_after: Optional[float] = None) -> dict:
+    """
+    JSON object e, se falhar, texto puro. Com `hedge_after` (s), o fallback
+    é disparado em paralelo se o primeiro ainda não respondeu nesse tempo
+    (hedge) — vale o que chegar primeiro com sucesso.
+    """
+    primary = asyncio.ensure_future(_achat_json_object(client, model, mode, ctx))
+    if hedge_after is None:
+        try:
+            return await primary
+        except Exception as e1:
+            try:
+                return await _achat_plain_json(client, model, mode, ctx)
+            except Exception as e2:
+                raise AIError(f"Falha ao obter insights da IA. JSON object: {e1} | Plain: {e2}")
+
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if primary in done and primary.exception() is None:
+        return primary.result()
+    backup = asyncio.ensure_future(_achat_plain_json(client, model, mode, ctx))
+    pending = {backup} if primary in done else {primary, backup}
+    errors = [primary.exception()] if primary in done else []
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return task.result()
+            errors.append(task.exception())
+    raise AIError("Falha ao obter insights da IA. " + " | ".join(str(e) for e in errors))
+
+class _InsightStream:
+    """
+    Parser incremental do JSON {"insights": [ {...}, {...} ]}: recebe o texto
+    em pedaços (tokens do stream) e devolve cada cartão assim que o objeto
+    correspondente fecha. Acompanha profundidade de chaves e strings/escapes,
+    então chaves dentro de textos não confundem a contagem.
+    """
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.in_array = False
+        self.done = False
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.start = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        out = []
+        self.buf += chunk or ""
+        if self.done:
+            return out
+        if not self.in_array:
+            m = re.search(r'"insights"\s*:\s*\[', self.buf)
+            if not m:
+                return out
+            self.in_array = True
+            self.pos = m.end()
+        buf, i = self.buf, self.pos
+        while i < len(buf):
+            ch = buf[i]
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif ch == '"':
+                self.in_str = True
+            elif ch == "{":
+                if self.depth == 0:
+                    self.start = i
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0 and self.start is not None:
+                    try:
+                        out.append(json.loads(buf[self.start:i + 1]))
+                    except ValueError:
+                        pass  # objeto malformado: pula este cartão
+                    self.start = None
+            elif ch == "]" and self.depth == 0:
+                self.done = True
+                i += 1
+                break
+            i += 1
+        self.pos = i
+        return out
+
+def _stream_json_object(client: OpenAI, model: str, mode: str, ctx: dict):
+    """Mesmo pedido de _achat_json_object, em stream: gera cada cartão (dict cru) ao fechar."""
+    t0 = time.perf_counter()
+    stream = client.chat.completions.create(
         model=model,
-        messages=[{"role":"system","content":system},
-                  {"role":"user","content":prompt}],
+        messages=_prompt_messages(mode, ctx),
+        response_format={"type":"json_object"},
         temperature=0.2,
+        stream=True,
+        stream_options={"include_usage": True},  # último chunk traz o usage (com cached_tokens)
     )
-    text = (resp.choices[0].message.content or "").strip()
-    return _extract_json(text)
+    parser = _InsightStream()
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                _record_usage(chunk.usage, time.perf_counter() - t0)
+            if not chunk.choices:
+                continue
+            for card in parser.feed(chunk.choices[0].delta.content or ""):
+                yield card
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
 
 # ------------------------------- público ------------------------------
 
@@ -125,20 +510,98 @@ def generate_insights(
     mode: Optional[str] = None,
     max_cards: int = 6,
     model: Optional[str] = None,
+    refresh: bool = False,
+    hedge_after: Optional[float] = None,
 ) -> List[Dict[str, Any]]:
+    """
+    Cartões de insight para o contexto. Respostas ficam no cache em disco
+    (compartilhado entre sessões/workers) pela chave (mode, model, contexto
+    truncado, max_cards); `refresh=True` ignora o cache e gera de novo.
+    Roda no loop assíncrono do processo (cliente pooled); com `hedge_after`
+    (s) o fallback em texto puro sai em paralelo se o JSON object demorar.
+    """
+    fut = submit_insights(context, mode=mode, max_cards=max_cards, model=model,
+                          refresh=refresh, hedge_after=hedge_after)
+    try:
+        return fut.result()
+    except AIError:
+        raise
+    except Exception as e:
+        raise AIError(f"Falha ao obter insights da IA: {e}")
+
+def generate_insights_stream(
+    context: Dict[str, Any],
+    mode: Optional[str] = None,
+    max_cards: int = 6,
+    model: Optional[str] = None,
+    refresh: bool = False,
+):
+    """
+    Versão em stream de generate_insights: gera cada cartão normalizado assim
+    que o objeto fecha no stream (o primeiro sai com a latência do 1º token).
+    Usa o mesmo cache em disco; se o stream falhar antes do 1º cartão, cai
+    para o caminho sem stream.
+    """
     mode = mode or context.get("mode") or "auto"
     model = model or _DEFAULT_MODEL
     ctx = _truncate_context(context)
 
+    key = _insights_key(mode, model, ctx, max_cards)
+    if not refresh:
+        cached = _cached_insights(key)
+        if cached is not None:
+            yield from cached
+            return
+
     client = _make_client()
-    system = _build_system_prompt(mode)
 
+    cards = []
     try:
-        payload = _chat_json_object(client, model, system, ctx)
-        return _normalize_cards(payload.get("insights", []), max_cards)
-    except Exception as e1:
-        try:
-            payload = _chat_plain_json(client, model, system, ctx)
-            return _normalize_cards(payload.get("insights", []), max_cards)
-        except Exception as e2:
-            raise AIError(f"Falha ao obter insights da IA. JSON object: {e1} | Plain: {e2}")
+        for raw in _stream_json_object(client, model, mode, ctx):
+            if len(cards) >= max_cards:
+                continue  # lê o stream até o fim: o último chunk traz o usage
+            card = _normalize_cards([raw], 1)[0]
+            cards.append(card)
+            yield card
+    except Exception as e:
+        if cards:
+            raise AIError(f"Stream interrompido após {len(cards)} cartões: {e}")
+    if not cards:
+        yield from generate_insights(context, mode=mode, max_cards=max_cards, model=model, refresh=True)
+        return
+    _save_insights(key, mode, model, max_cards, cards)
+
+async def agenerate_insights(
+    context: Dict[str, Any],
+    mode: Optional[str] = None,
+    max_cards: int = 6,
+    model: Optional[str] = None,
+    refresh: bool = False,
+    hedge_after: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    generate_insights assíncrono (cliente AsyncOpenAI do processo). Mesmo
+    cache em disco; `hedge_after` (s) dispara o fallback em paralelo.
+    Deve rodar no loop de _ai_loop() — use submit_insights/generate_insights.
+    """
+    mode = mode or context.get("mode") or "auto"
+    model = model or _DEFAULT_MODEL
+    ctx = _truncate_context(context)
+
+    key = _insights_key(mode, model, ctx, max_cards)
+    if not refresh:
+        cached = _cached_insights(key)
+        if cached is not None:
+            return cached
+
+    payload = await _afetch_payload(_make_async_client(), model, mode, ctx, hedge_after)
+    cards = _normalize_cards(payload.get("insights", []), max_cards)
+    _save_insights(key, mode, model, max_cards, cards)
+    return cards
+
+def submit_insights(context: Dict[str, Any], **kwargs) -> Future:
+    """
+    Dispara um job de insights em segundo plano e devolve um Future
+    (`.result()` bloqueia; a exceção, se houver, é AIError).
+    """
+    return asyncio.run_coroutine_threadsafe(agenerate_insights(context, **kwargs), _ai_loop())
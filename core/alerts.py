@@ -0,0 +1,69 @@
+# core/alerts.py
+import numpy as np
+import pandas as pd
+
+SEVERITY_THRESHOLDS = (15.0, 30.0)  # |Δ%| para "medium" / "high"
+
+def _severity(delta_pct: pd.Series, thresholds=SEVERITY_THRESHOLDS) -> np.ndarray:
+    absd = delta_pct.abs()
+    return np.select([absd >= thresholds[1], absd >= thresholds[0]], ["high", "medium"], default="low")
+
+def _arrow(delta: pd.Series) -> np.ndarray:
+    return np.select([delta > 0, delta < 0], ["▲", "▼"], default="↔")
+
+def score_trends(df: pd.DataFrame, metrics, windows=(5, 10), by: str | None = None,
+                 thresholds=SEVERITY_THRESHOLDS) -> pd.DataFrame:
+    """
+    Pontua tendências de várias métricas × janelas (× times) numa passada.
+
+    df: uma linha por jogo, em ordem cronológica (por grupo, se `by` for dado).
+    Para cada (grupo, métrica, janela) compara a média dos últimos `w` valores
+    válidos com a média da temporada (baseline):
+      value, baseline, delta_pct, zscore (Δ / desvio-padrão da janela),
+      n_valid, confidence (= min(n_valid, w) / w), severity e arrow.
+    Retorna um DataFrame "tidy" — a página só renderiza.
+    """
+    group_col = by or "_all"
+    data = df.assign(_all=0) if by is None else df
+    long = (
+        data[[group_col] + list(metrics)]
+        .assign(_order=np.arange(len(data)))
+        .melt(id_vars=[group_col, "_order"], var_name="metric", value_name="v")
+    )
+    long["v"] = pd.to_numeric(long["v"], errors="coerce")
+    long = long.dropna(subset=["v"]).sort_values([group_col, "metric", "_order"], kind="stable")
+
+    keys = [group_col, "metric"]
+    grouped = long.groupby(keys, sort=False)["v"]
+    base = grouped.agg(baseline="mean", n_valid="size")
+    # posição contada do fim: 0 = jogo válido mais recente
+    long["_from_end"] = long.groupby(keys, sort=False).cumcount(ascending=False)
+
+    frames = []
+    for w in windows:
+        win = long[long["_from_end"] < w].groupby(keys, sort=False)["v"].agg(value="mean", std="std")
+        frames.append(base.join(win).assign(window=w))
+    out = pd.concat(frames).reset_index()
+
+    # métricas sem nenhum valor válido continuam aparecendo (com NaN)
+    full = pd.MultiIndex.from_product(
+        [data[group_col].unique(), list(metrics), list(windows)], names=[group_col, "metric", "window"]
+    )
+    out = out.set_index([group_col, "metric", "window"]).reindex(full).reset_index()
+    out["n_valid"] = out["n_valid"].fillna(0).astype(int)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = out["value"] - out["baseline"]
+        out["delta_pct"] = np.where(out["baseline"] != 0, delta / out["baseline"] * 100.0, np.nan)
+        out["zscore"] = np.where(out["std"] > 0, delta / out["std"], np.nan)
+    out["confidence"] = (np.minimum(out["n_valid"], out["window"]) / out["window"]).round(2)
+    out["severity"] = _severity(out["delta_pct"], thresholds)
+    out["arrow"] = _arrow(out["delta_pct"])
+
+    # mantém a ordem de métricas pedida (e janelas dentro de cada métrica)
+    out["metric"] = pd.Categorical(out["metric"], categories=list(metrics), ordered=True)
+    out = out.sort_values([group_col, "metric", "window"]).reset_index(drop=True)
+    out["metric"] = out["metric"].astype(str)
+    cols = ([by] if by else []) + ["metric", "window", "value", "baseline", "delta_pct", "zscore",
+                                   "std", "n_valid", "confidence", "severity", "arrow"]
+    return out[cols]
@@ -1,5 +1,5 @@
 # core/api_client.py
-from core.cache import get_json
+from core.cache import get_json, get_json_many, get_or_build, is_cached, prime
 
 def team_by_id(team_id: int):
     """Busca um time pelo ID e retorna dict enxuto."""
@@ -31,6 +31,34 @@ def players_page(team_id: int, season: int, page: int = 1):
     """Uma página do endpoint /players (team+season). Retorna response[]."""
     data = get_json("/players", {"team": team_id, "season": season, "page": page})
     return data.get("response", [])
+
+def players_all(team_id: int, season: int, max_workers: int = 6):
+    """
+    Elenco completo do /players (team+season) numa lista só.
+    Lê a página 1, usa paging.total para buscar as demais em paralelo e
+    guarda o resultado unido como uma única entrada de cache.
+    """
+    params = {"team": team_id, "season": season}
+
+    def build():
+        first = get_json("/players", {**params, "page": 1})
+        total = int(((first.get("paging") or {}).get("total")) or 1)
+        rest = get_json_many(
+            [("/players", {**params, "page": p}) for p in range(2, total + 1)],
+            max_workers=max_workers,
+        )
+        pages = [first] + rest
+        items = [it for pg in pages for it in (pg or {}).get("response", [])]
+        complete = all(pg and not pg.get("errors") for pg in pages)
+        merged = {
+            "errors": [],
+            "results": len(items),
+            "paging": {"current": 1, "total": 1},
+            "response": items,
+        }
+        return merged, complete
+
+    return get_or_build("/players/all", params, build).get("response", [])
     
 # ------------------- TEAMS --------------------
 def find_team(name: str):
@@ -76,6 +104,10 @@ def fixtures(team_id: int, season: int, next: int | None = None):
         params["next"] = next
     return get_json("/fixtures", params).get("response", [])
 
+def league_fixtures(league_id: int, season: int):
+    """Todos os jogos da liga na temporada (1 chamada)."""
+    return get_json("/fixtures", {"league": league_id, "season": season}).get("response", [])
+
 def fixture_statistics(fixture_id: int):
     return get_json("/fixtures/statistics", {"fixture": fixture_id}).get("response", [])
 
@@ -87,4 +119,83 @@ def fixture_events(fixture_id: int):
 
 # ------------------- PLAYERS --------------------
 def players(team_id: int, season: int, page: int = 1):
-    return get_json("/players", {"team": team_id, "season": season, "page": page}).get("response", [])
+    return players_page(team_id, season, page)
+
+_DETAIL_PATHS = {
+    "statistics": "/fixtures/statistics",
+    "lineups":    "/fixtures/lineups",
+    "events":     "/fixtures/events",
+}
+
+IDS_BATCH = 20  # limite do /fixtures?ids=
+
+def _detail_envelope(path: str, fixture_id: int, response: list) -> dict:
+    """Reproduz o envelope que /fixtures/<detalhe>?fixture= devolveria."""
+    return {
+        "get": path.lstrip("/"),
+        "parameters": {"fixture": str(fixture_id)},
+        "errors": [],
+        "results": len(response),
+        "paging": {"current": 1, "total": 1},
+        "response": response,
+    }
+
+def hydrate_fixtures(fixture_ids, max_workers: int = 4, on_progress=None) -> int:
+    """
+    Busca /fixtures?ids=a-b-c (até 20 jogos por chamada, já com statistics,
+    lineups e events) e grava cada recorte na mesma entrada de cache
+    que fixture_statistics/fixture_lineups/fixture_events leem.
+    Só entram jogos com algum detalhe ausente/expirado. Retorna nº de jogos hidratados.
+    """
+    ids = list(dict.fromkeys(fid for fid in fixture_ids if fid is not None))
+    missing = [
+        fid for fid in ids
+        if not all(is_cached(path, {"fixture": fid}) for path in _DETAIL_PATHS.values())
+    ]
+    if not missing:
+        return 0
+    batches = [missing[i:i + IDS_BATCH] for i in range(0, len(missing), IDS_BATCH)]
+    calls = [("/fixtures", {"ids": "-".join(str(fid) for fid in b)}) for b in batches]
+    # swr=False: lote expirado é baixado de novo (não vira recorte "novo" de dado velho)
+    metas = get_json_many(calls, max_workers=max_workers, on_progress=on_progress,
+                          swr=False, with_meta=True)
+
+    hydrated = 0
+    for meta in metas:
+        if not meta or meta.get("stale"):
+            continue  # sem quota: o cache antigo do lote não é recortado
+        fetched_at = meta.get("fetched_at")
+        for item in (meta.get("data") or {}).get("response", []):
+            fid = (item.get("fixture") or {}).get("id")
+            if fid is None:
+                continue
+            for kind, path in _DETAIL_PATHS.items():
+                prime(path, {"fixture": fid}, _detail_envelope(path, fid, item.get(kind) or []), fetched_at)
+            hydrated += 1
+    return hydrated
+
+def _phase(on_progress, start: float, span: float):
+    """Mapeia o progresso de uma etapa para a faixa [start, start+span] da barra."""
+    if not on_progress:
+        return None
+    return lambda done, total: on_progress(start + span * done / total, 1.0)
+
+def fixtures_details(fixture_ids, kinds=("statistics", "lineups", "events"),
+                     max_workers: int = 6, on_progress=None):
+    """
+    Detalhes de vários jogos de uma vez.
+    1) hydrate_fixtures: lotes de 20 via /fixtures?ids= para o que falta no cache;
+    2) leitura em paralelo (concorrência limitada) — normalmente tudo cache hit.
+    Retorna {fixture_id: {"statistics": [...], "lineups": [...], "events": [...]}}
+    só com os `kinds` pedidos; detalhe que não pôde ser obtido (erro/quota) vem
+    None em vez de []. on_progress(feitos, total) p/ barra de progresso.
+    """
+    ids = list(dict.fromkeys(fid for fid in fixture_ids if fid is not None))
+    hydrate_fixtures(ids, on_progress=_phase(on_progress, 0.0, 0.8))
+    calls = [(_DETAIL_PATHS[k], {"fixture": fid}) for fid in ids for k in kinds]
+    payloads = get_json_many(calls, max_workers=max_workers, on_progress=_phase(on_progress, 0.8, 0.2))
+    out = {fid: {} for fid in ids}
+    for (path, params), data in zip(calls, payloads):
+        kind = next(k for k, p in _DETAIL_PATHS.items() if p == path)
+        out[params["fixture"]][kind] = data.get("response", []) if data else None
+    return out
@@ -3,12 +3,20 @@ import os
 import time
 import json
 import hashlib
+import threading
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
 import requests
 
+from core import store
+
 API_HOST = "https://v3.football.api-sports.io"
+HOUR = 60 * 60
 DAY = 60 * 60 * 24  # 24 horas
+FOREVER = None      # TTL "sem expiração" (payload imutável)
+MEMORY_TTL = 10 * 60  # cache em memória do worker; a validade real fica no disco
+FINAL_STATUSES = {"FT", "AET", "PEN"}
 
 # -------------------- Sessão HTTP (1x por worker) --------------------
 @st.cache_resource
@@ -72,8 +80,17 @@ def _api_key():
 def _refresh_nonce():
     return st.session_state.get("refresh_key", 0)
 
+def refresh_nonce() -> int:
+    """Contador do botão 'Atualizar agora' (para chaves de caches derivados)."""
+    return _refresh_nonce()
+
+def _refresh_after() -> float:
+    """Entradas do disco anteriores a este instante são ignoradas (botão 'Atualizar agora')."""
+    return st.session_state.get("refresh_after", 0.0)
+
 def bump_refresh_key():
     st.session_state["refresh_key"] = st.session_state.get("refresh_key", 0) + 1
+    st.session_state["refresh_after"] = time.time()
 
 # -------------------- util p/ chave humana --------------------
 def _fingerprint(path: str, params: dict) -> str:
@@ -96,60 +113,539 @@ def last_updated_global() -> float | None:
         return None
     return max(lu.values())
 
+def _store_stale(key: str, ts: float | None):
+    """Marca (ts) ou desmarca (None) uma chave servida expirada nesta sessão."""
+    stale = st.session_state.setdefault("_stale_updates", {})
+    if ts is None:
+        stale.pop(key, None)
+    else:
+        stale[key] = ts
+
+def oldest_stale() -> float | None:
+    """Timestamp da entrada expirada mais antiga em uso nesta sessão (None se nenhuma)."""
+    stale = st.session_state.get("_stale_updates", {})
+    return min(stale.values()) if stale else None
+
 def _fmt_dt(ts: float | None) -> str:
     if not ts:
         return "—"
     # formata no fuso local do servidor
     return dt.datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M")
 
-def last_updated_text() -> str:
-    ts = last_updated_global()
-    if not ts:
-        return "— sem dados nesta sessão —"
+def _ago_text(ts: float) -> str:
     ago = int(time.time() - ts)
     hours = ago // 3600
     mins = (ago % 3600) // 60
     return f"{_fmt_dt(ts)} (há {hours}h {mins}m)"
 
-# -------------------- chamada com cache 24h + meta --------------------
-@st.cache_data(ttl=DAY)  # cache forte: 24 horas
-def _fetch_with_meta(path: str, params: dict, nonce: int):
-    sess = http_session(_api_key())
+def last_updated_text() -> str:
+    ts = last_updated_global()
+    if not ts:
+        return "— sem dados nesta sessão —"
+    return _ago_text(ts)
+
+def render_data_age():
+    """Caption com a idade do dado mais antigo servido expirado (stale-while-revalidate)."""
+    ts = oldest_stale()
+    if ts:
+        st.caption(f"⏳ Exibindo dados em cache de {_ago_text(ts)} — atualizando em segundo plano; recarregue em instantes.")
+
+# -------------------- política de validade por endpoint --------------------
+def _fetched_after_final(fixture_id, fetched_at: float | None) -> bool:
+    """
+    Jogo encerrado e dado baixado depois de o encerramento ser visto. O que foi
+    baixado durante o jogo (estatística parcial) continua expirando normalmente.
+    """
+    since = store.final_since(fixture_id)
+    return since is not None and fetched_at is not None and fetched_at >= since
+
+def _immutable_if_final(ttl_open: int):
+    """Detalhes de jogo encerrado nunca mudam; enquanto não encerrar, expira em ttl_open."""
+    def rule(params: dict, fetched_at: float | None = None):
+        return FOREVER if _fetched_after_final(params.get("fixture"), fetched_at) else ttl_open
+    return rule
+
+def _fixtures_rule(params: dict, fetched_at: float | None = None):
+    if params.get("next") or params.get("live"):
+        return HOUR                     # próximo jogo / ao vivo envelhecem rápido
+    if params.get("id"):
+        return FOREVER if _fetched_after_final(params["id"], fetched_at) else 15 * 60
+    if params.get("ids"):
+        ids = str(params["ids"]).split("-")
+        return FOREVER if all(_fetched_after_final(i, fetched_at) for i in ids) else 15 * 60
+    return 2 * HOUR                     # calendário da temporada (status/placares mudam no dia do jogo)
+
+# path -> TTL em segundos | FOREVER | regra(params, fetched_at) -> TTL
+TTL_POLICY = {
+    "/fixtures":            _fixtures_rule,
+    "/fixtures/statistics": _immutable_if_final(15 * 60),
+    "/fixtures/lineups":    _immutable_if_final(15 * 60),
+    "/fixtures/events":     _immutable_if_final(15 * 60),
+    "/fixtures/players":    _immutable_if_final(15 * 60),
+    "/fixtures/headtohead": 6 * HOUR,
+    "/standings":           HOUR,
+    "/teams/statistics":    3 * HOUR,
+    "/players":             12 * HOUR,
+    "/players/all":         12 * HOUR,  # elenco inteiro (todas as páginas), montado localmente
+    "/teams":               7 * DAY,
+    "/leagues":             7 * DAY,
+    "/model/strength":      FOREVER,    # parâmetros ajustados localmente; validade pelo hash dos jogos
+    "/model/standings_history": FOREVER,
+}
+
+def ttl_for(path: str, params: dict, fetched_at: float | None = None):
+    """
+    TTL (segundos) de uma entrada baixada em fetched_at segundo TTL_POLICY;
+    DAY para endpoints não listados.
+    """
+    rule = TTL_POLICY.get(path, DAY)
+    return rule(params, fetched_at) if callable(rule) else rule
+
+def _is_fresh(fetched_at: float, ttl) -> bool:
+    return ttl is FOREVER or time.time() - fetched_at < ttl
+
+def _entry_is_fresh(path: str, params: dict, fetched_at: float, ttl="policy") -> bool:
+    """Validade de uma entrada; com ttl="policy" a regra considera quando ela foi baixada."""
+    if ttl == "policy":
+        ttl = ttl_for(path, params, fetched_at)
+    return _is_fresh(fetched_at, ttl)
+
+def _remember_finals(path: str, data: dict, fetched_at: float | None = None):
+    """Anota jogos encerrados vistos em /fixtures para a regra 'imutável quando final'."""
+    if path != "/fixtures" or not isinstance(data, dict):
+        return
+    finals = {}
+    for fx in data.get("response") or []:
+        f = (fx or {}).get("fixture") or {}
+        short = (f.get("status") or {}).get("short")
+        if short in FINAL_STATUSES and f.get("id") is not None:
+            finals[f["id"]] = short
+    store.mark_final(finals, fetched_at)
+
+# -------------------- chamada com cache persistente + meta --------------------
+def _is_storable(data) -> bool:
+    """A API-Football responde 200 com 'errors' preenchido (quota, parâmetro inválido...)."""
+    if not isinstance(data, dict):
+        return False
+    return not data.get("errors")
+
+# -------------------- quota da API (token bucket) --------------------
+class QuotaExceeded(RuntimeError):
+    """Sem quota na API-Football e sem cache para servir no lugar."""
+
+INTERACTIVE = "interactive"  # chamadas de página: têm prioridade e podem esperar um token
+BACKGROUND = "background"    # refresh/prefetch: só andam com folga de quota, nunca esperam
+
+class _QuotaScheduler:
+    """
+    Token bucket alimentado pelos headers da API-Football:
+    - X-RateLimit-Limit / X-RateLimit-Remaining            → por minuto
+    - x-ratelimit-requests-limit / -requests-remaining     → por dia
+    Perto do limite, chamadas que têm cache para servir recuam em vez de tomar 429.
+    """
+    DAILY_RESERVE = 10          # requests/dia guardados para páginas sem cache
+    BACKGROUND_HEADROOM = 0.5   # background só usa tokens acima de 50% do balde
+    WAIT_WITH_FALLBACK = 2.0    # s de espera máx. quando há cache antigo para servir
+    WAIT_WITHOUT_FALLBACK = 10.0  # sem cache: espera curta (roda no script da página, sem feedback)
+
+    def __init__(self, per_minute: int = 10):
+        self._lock = threading.Lock()
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self.daily_limit = None
+        self.daily_remaining = None
+        self.blocked_until = 0.0
+        self._last = time.monotonic()
+        self.throttled = 0  # chamadas que recuaram para o cache
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.per_minute, self.tokens + (now - self._last) * self.per_minute / 60.0)
+        self._last = now
+
+    def _try_take(self, priority: str, has_fallback: bool) -> bool | None:
+        """True = pode ir; False = recuar já; None = esperar um token."""
+        with self._lock:
+            self._refill()
+            if self.daily_remaining is not None:
+                if self.daily_remaining <= 0:
+                    return False
+                if has_fallback and self.daily_remaining <= self.DAILY_RESERVE:
+                    return False
+            if priority == BACKGROUND:
+                floor = 1 + self.per_minute * self.BACKGROUND_HEADROOM
+                reserve = self.DAILY_RESERVE * 2
+                if self.tokens < floor or time.time() < self.blocked_until:
+                    return False
+                if self.daily_remaining is not None and self.daily_remaining <= reserve:
+                    return False
+            elif self.tokens < 1 or time.time() < self.blocked_until:
+                return None
+            self.tokens -= 1
+            if self.daily_remaining is not None:
+                self.daily_remaining -= 1
+            return True
+
+    def acquire(self, priority: str = INTERACTIVE, has_fallback: bool = False) -> bool:
+        deadline = time.monotonic() + (self.WAIT_WITH_FALLBACK if has_fallback else self.WAIT_WITHOUT_FALLBACK)
+        while True:
+            ok = self._try_take(priority, has_fallback)
+            if ok is not None:
+                break
+            if time.monotonic() >= deadline:
+                ok = False
+                break
+            time.sleep(0.25)
+        if not ok:
+            with self._lock:
+                self.throttled += 1
+        return ok
+
+    def update(self, headers):
+        """Sincroniza o balde com o que a API informou na resposta."""
+        def _int(name):
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+        minute_limit = _int("X-RateLimit-Limit")
+        minute_left = _int("X-RateLimit-Remaining")
+        day_limit = _int("x-ratelimit-requests-limit")
+        day_left = _int("x-ratelimit-requests-remaining")
+        with self._lock:
+            self._refill()
+            if minute_limit:
+                self.per_minute = minute_limit
+            if minute_left is not None:
+                self.tokens = min(self.tokens, float(minute_left))
+            if day_limit is not None:
+                self.daily_limit = day_limit
+            if day_left is not None:
+                self.daily_remaining = day_left
+
+    def penalize(self, retry_after=None):
+        """429 (ou erro de rateLimit no corpo): esvazia o balde e respeita Retry-After."""
+        try:
+            wait = float(retry_after) if retry_after is not None else 60.0
+        except (TypeError, ValueError):
+            wait = 60.0
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = time.time() + wait
+
+_QUOTA = _QuotaScheduler()
+
+def quota_stats() -> dict:
+    """Estado do balde no processo (para exibir na sidebar)."""
+    return {
+        "per_minute": _QUOTA.per_minute,
+        "tokens": int(_QUOTA.tokens),
+        "daily_limit": _QUOTA.daily_limit,
+        "daily_remaining": _QUOTA.daily_remaining,
+        "throttled": _QUOTA.throttled,
+    }
+
+def _is_quota_error(data) -> bool:
+    errors = data.get("errors") if isinstance(data, dict) else None
+    if isinstance(errors, dict):
+        return any(k in errors for k in ("rateLimit", "requests"))
+    return False
+
+def _download(sess, path: str, params: dict) -> dict:
+    """Baixa da API e grava no disco (quando o payload é válido)."""
     url = f"{API_HOST}{path}"
     r = sess.get(url, params=params, timeout=60)
+    _QUOTA.update(r.headers)
+    if r.status_code == 429:
+        _QUOTA.penalize(r.headers.get("Retry-After"))
+        raise QuotaExceeded(f"API-Football respondeu 429 para {path}.")
     r.raise_for_status()
+    data = r.json()
+    if _is_quota_error(data):
+        _QUOTA.penalize()
+        raise QuotaExceeded(f"Quota da API-Football esgotada: {data.get('errors')}")
+    fetched_at = time.time()
+    if _is_storable(data):
+        store.put(_fingerprint(path, params), path, params, data, fetched_at)
+        _remember_finals(path, data, fetched_at)
     return {
-        "data": r.json(),          # payload bruto da API
-        "fetched_at": time.time()  # quando foi baixado
+        "data": data,              # payload bruto da API
+        "fetched_at": fetched_at   # quando foi baixado
     }
 
-def get_json(path: str, params: dict, ttl_seconds: int | None = None) -> dict:
+# -------------------- single-flight (coalescência entre sessões) --------------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _SingleFlight:
     """
-    Retorna apenas o payload JSON.
-    O TTL é 24h (definido no decorator). O parâmetro ttl_seconds está aqui
-    apenas por compatibilidade (ignorado neste modo 'por dia').
+    Chamadas concorrentes para a mesma chave esperam o mesmo request em voo,
+    em vez de cada sessão disparar o seu (ex.: vários analistas logo após o jogo).
     """
-    meta = _fetch_with_meta(path, params, _refresh_nonce())
-    # registra 'última atualização' humana nesta sessão
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self.executed = 0   # requests que realmente saíram
+        self.coalesced = 0  # requests poupados (esperaram o líder)
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+_FLIGHTS = _SingleFlight()
+
+def singleflight_stats() -> dict:
+    """Contadores do processo: {"executed": n, "coalesced": n}."""
+    return {"executed": _FLIGHTS.executed, "coalesced": _FLIGHTS.coalesced}
+
+def _download_once(sess, path: str, params: dict, key: str, fresh_after: float, ttl,
+                   priority: str = INTERACTIVE) -> dict:
+    """
+    Download coalescido por chave. O líder confere o disco de novo antes de
+    baixar: outro líder pode ter terminado entre a leitura e a entrada no voo.
+    Só o líder consome quota; sem token, levanta QuotaExceeded.
+    """
+    def fn():
+        hit = store.get(key)
+        if hit and hit["fetched_at"] >= fresh_after and _entry_is_fresh(path, params, hit["fetched_at"], ttl):
+            return hit
+        if not _QUOTA.acquire(priority, has_fallback=hit is not None):
+            raise QuotaExceeded(f"Sem quota na API-Football para {path} agora.")
+        return _download(sess, path, params)
+    return _FLIGHTS.do(key, fn)
+
+# -------------------- stale-while-revalidate --------------------
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
+def _refresh_in_background(sess, path: str, params: dict, key: str):
+    """Agenda o download em outra thread (no máximo 1 refresh por chave no processo)."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def job():
+        try:
+            if _QUOTA.acquire(BACKGROUND, has_fallback=True):
+                _FLIGHTS.do(key, lambda: _download(sess, path, params))
+        except Exception:
+            pass  # mantém a entrada antiga; a próxima leitura tenta de novo
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _REFRESH_POOL.submit(job)
+
+def _load_or_fetch(api_key: str, path: str, params: dict, fresh_after: float = 0.0,
+                   ttl="policy", swr: bool = True, priority: str = INTERACTIVE) -> dict:
+    """
+    Camada persistente: lê do SQLite compartilhado (sobrevive a restarts e é
+    visto por todos os workers do host) e só vai à API se não houver entrada válida.
+    ttl="policy" usa TTL_POLICY; um número (ou FOREVER) sobrescreve a política.
+    Com swr=True, uma entrada expirada é devolvida na hora (com "stale": True)
+    e atualizada em segundo plano. Sem quota na API, qualquer entrada em disco
+    (mesmo antiga) é servida como "stale" no lugar de arriscar um 429.
+    """
+    key = _fingerprint(path, params)
+    hit = store.get(key)
+    usable = hit is not None and hit["fetched_at"] >= fresh_after
+    if usable and _entry_is_fresh(path, params, hit["fetched_at"], ttl):
+        return hit
+
+    sess = http_session(api_key)
+    if usable and swr:
+        _refresh_in_background(sess, path, params, key)
+        return {**hit, "stale": True}
+    try:
+        return _download_once(sess, path, params, key, fresh_after, ttl, priority)
+    except QuotaExceeded:
+        if hit is None:
+            raise
+        return {**hit, "stale": True}
+
+@st.cache_data(ttl=MEMORY_TTL)  # memória do worker; a validade por endpoint é decidida no disco
+def _fetch_with_meta(path: str, params: dict, nonce: int, fresh_after: float = 0.0,
+                     ttl="policy", swr: bool = True, priority: str = INTERACTIVE):
+    return _load_or_fetch(_api_key(), path, params, fresh_after, ttl, swr, priority)
+
+def _quota_envelope(path: str, params: dict, message: str) -> dict:
+    """Resposta vazia no formato da API, com 'errors' preenchido (não vai para cache)."""
+    return {
+        "get": path.lstrip("/"),
+        "parameters": {k: str(v) for k, v in params.items()},
+        "errors": {"requests": message},
+        "results": 0,
+        "paging": {"current": 1, "total": 1},
+        "response": [],
+    }
+
+def _warn_quota(path: str):
+    """Avisa uma vez por endpoint/sessão que a página está sem dados por falta de quota."""
+    warned = st.session_state.setdefault("_quota_warned", set())
+    if path in warned:
+        return
+    warned.add(path)
+    try:
+        st.toast(f"⚠️ Sem quota na API-Football agora — {path} ficou sem dados. Tente em alguns minutos.")
+    except Exception:
+        pass
+
+def _resolve(path: str, params: dict, ttl="policy", swr: bool = True, priority: str = INTERACTIVE) -> dict:
+    try:
+        meta = _fetch_with_meta(path, params, _refresh_nonce(), _refresh_after(), ttl, swr, priority)
+    except QuotaExceeded as e:
+        # sem quota e sem cache: a página recebe resposta vazia (como um erro da API) em vez de traceback
+        _warn_quota(path)
+        return {"data": _quota_envelope(path, params, str(e)), "fetched_at": None}
     key = _fingerprint(path, params)
+    if meta.get("stale"):
+        # a memória guardou a versão antiga: confere se o refresh em 2º plano já terminou
+        hit = store.get(key)
+        if hit and hit["fetched_at"] > meta["fetched_at"]:
+            meta = hit
     _store_last_update(key, meta.get("fetched_at", time.time()))
-    return meta["data"]
+    _store_stale(key, meta.get("fetched_at") if meta.get("stale") else None)
+    return meta
+
+def get_json(path: str, params: dict, ttl_seconds: int | None = None, swr: bool = True,
+             priority: str = INTERACTIVE) -> dict:
+    """
+    Retorna apenas o payload JSON. Sem quota e sem cache, devolve o envelope
+    vazio com "errors" preenchido (response=[]).
+    A validade vem de TTL_POLICY (por endpoint); ttl_seconds, se informado,
+    sobrescreve a política para esta chamada. Com swr=True (padrão), dado
+    expirado é servido imediatamente e atualizado em segundo plano.
+    priority=BACKGROUND para prefetch: só consome quota com folga e nunca espera.
+    """
+    ttl = "policy" if ttl_seconds is None else ttl_seconds
+    # registra 'última atualização' humana nesta sessão (dentro de _resolve)
+    return _resolve(path, params, ttl, swr, priority)["data"]
 
 def get_json_with_meta(path: str, params: dict) -> tuple[dict, float]:
     """Retorna (data, fetched_at) para quem quiser mostrar timestamp específico."""
-    meta = _fetch_with_meta(path, params, _refresh_nonce())
-    key = _fingerprint(path, params)
-    _store_last_update(key, meta.get("fetched_at", time.time()))
+    meta = _resolve(path, params)
     return meta["data"], meta.get("fetched_at", None)
 
+def get_json_many(calls: list[tuple[str, dict]], max_workers: int = 6, on_progress=None,
+                  priority: str = INTERACTIVE, swr: bool = True, with_meta: bool = False) -> list[dict]:
+    """
+    Resolve várias chamadas (path, params) em paralelo, com no máximo
+    max_workers requests simultâneos (a quota continua valendo por chamada).
+    Retorna os payloads na mesma ordem de `calls`; falhas viram {}.
+    with_meta=True devolve {"data", "fetched_at"[, "stale"]} no lugar do payload;
+    swr=False não serve entrada expirada (baixa de novo), como em get_json.
+    on_progress(feitos, total) é chamado na thread da página (serve p/ st.progress).
+    """
+    total = len(calls)
+    out: list[dict] = [{} for _ in calls]
+    if not total:
+        return out
+    # tudo que depende do contexto do Streamlit é resolvido aqui, na thread da página
+    api_key, fresh_after = _api_key(), _refresh_after()
+    workers = max(1, min(max_workers, total))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-bulk") as pool:
+        futures = {
+            pool.submit(_load_or_fetch, api_key, path, params, fresh_after, "policy", swr, priority): i
+            for i, (path, params) in enumerate(calls)
+        }
+        for done, fut in enumerate(as_completed(futures), start=1):
+            i = futures[fut]
+            path, params = calls[i]
+            try:
+                meta = fut.result()
+            except Exception:
+                meta = None
+            if meta is not None:
+                key = _fingerprint(path, params)
+                _store_last_update(key, meta.get("fetched_at", time.time()))
+                _store_stale(key, meta.get("fetched_at") if meta.get("stale") else None)
+                out[i] = meta if with_meta else meta["data"]
+            if on_progress:
+                on_progress(done, total)
+    return out
+
+def is_cached(path: str, params: dict) -> bool:
+    """Há entrada válida (pela política) no disco para esta chamada?"""
+    ts = store.fetched_at(_fingerprint(path, params))
+    return ts is not None and ts >= _refresh_after() and _entry_is_fresh(path, params, ts)
+
+def peek(path: str, params: dict) -> dict | None:
+    """Entrada do disco ({"data", "fetched_at"}) sem olhar validade nem ir à API."""
+    return store.get(_fingerprint(path, params))
+
+def prime(path: str, params: dict, data: dict, fetched_at: float | None = None):
+    """
+    Grava no disco um payload obtido por outra rota (ex.: recorte de /fixtures?ids=).
+    Com fetched_at (quando a origem foi baixada), não sobrescreve entrada mais nova.
+    """
+    if not _is_storable(data):
+        return
+    key = _fingerprint(path, params)
+    if fetched_at is not None and (store.fetched_at(key) or 0) > fetched_at:
+        return
+    store.put(key, path, params, data, fetched_at)
+
+def get_or_build(path: str, params: dict, build) -> dict:
+    """
+    Entrada de cache montada localmente (ex.: junção de várias páginas da API),
+    guardada no disco como uma chamada comum e sujeita à mesma TTL_POLICY.
+    build() deve devolver (payload, completo?); payload incompleto não é gravado.
+    """
+    key = _fingerprint(path, params)
+    hit = store.get(key)
+    if hit and hit["fetched_at"] >= _refresh_after() and _entry_is_fresh(path, params, hit["fetched_at"]):
+        _store_last_update(key, hit["fetched_at"])
+        return hit["data"]
+    data, complete = build()
+    if complete:
+        prime(path, params, data)
+    _store_last_update(key, time.time())
+    return data
+
 # -------------------- UI pronta p/ sidebar --------------------
 def render_cache_controls():
     st.sidebar.markdown("### 🔄 Dados")
     st.sidebar.caption(f"Última atualização (sessão): **{last_updated_text()}**")
+    q = quota_stats()
+    if q["daily_remaining"] is not None:
+        st.sidebar.caption(f"Quota API-Football hoje: **{q['daily_remaining']}/{q['daily_limit']}** • {q['per_minute']}/min")
+    saved = singleflight_stats()["coalesced"]
+    if saved:
+        st.sidebar.caption(f"Chamadas poupadas por coalescência (processo): **{saved}**")
+    if oldest_stale():
+        st.sidebar.caption(f"Dado mais antigo em uso: **{_ago_text(oldest_stale())}** (atualizando…)")
     col1, col2 = st.sidebar.columns(2)
     if col1.button("Atualizar agora"):
         bump_refresh_key()
-        st.experimental_rerun()
+        st.rerun()
     if col2.button("Limpar cache"):
+        # memória do worker + respostas em disco (core/store.py): a próxima leitura vai à API
         st.cache_data.clear()
-        st.success("Cache de dados limpo.")
+        removed = store.clear()
+        st.success(f"Cache de dados limpo ({removed} respostas em disco).")
@@ -0,0 +1,141 @@
+# core/match_facts.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import api_client
+from core.cache import FINAL_STATUSES, refresh_nonce
+from core.stat_aliases import STAT_COLUMNS, pivot_statistics, to_numeric
+
+def _fixture_key(fx) -> tuple:
+    """Resumo hashable de um jogo (entra na chave do cache)."""
+    f = fx.get("fixture") or {}
+    t = fx.get("teams") or {}
+    h, a = t.get("home") or {}, t.get("away") or {}
+    g = fx.get("goals") or {}
+    return (
+        f.get("id"), (f.get("status") or {}).get("short"), f.get("date"),
+        h.get("id"), h.get("name"), a.get("id"), a.get("name"),
+        g.get("home"), g.get("away"), (fx.get("league") or {}).get("round"),
+    )
+
+class _Incomplete(Exception):
+    """Montagem com estatística faltando (erro/quota): devolvida, mas fora do cache."""
+    def __init__(self, frame: pd.DataFrame):
+        super().__init__("estatísticas incompletas")
+        self.frame = frame
+
+def _statistics(fixtures_key: tuple) -> tuple[dict, bool]:
+    """({fixture_id: blocos de /fixtures/statistics}, todos obtidos?)"""
+    details = api_client.fixtures_details([k[0] for k in fixtures_key], kinds=("statistics",))
+    stats = {fid: d.get("statistics") for fid, d in details.items()}
+    return stats, all(v is not None for v in stats.values())
+
+def _uncached_if_incomplete(build, *args) -> pd.DataFrame:
+    """st.cache_data não guarda o resultado quando a função levanta exceção."""
+    try:
+        return build(*args)
+    except _Incomplete as e:
+        return e.frame
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _build(team_id: int, fixtures_key: tuple, nonce: int) -> pd.DataFrame:
+    stats, complete = _statistics(fixtures_key)
+    # todas as estatísticas da temporada pivotadas numa passada (core/stat_aliases.py)
+    wide = pivot_statistics(stats, team_id)
+    rows = []
+    for fid, status, date, hid, hname, aid, aname, gh, ga, rnd in fixtures_key:
+        our_home = (hid == team_id)
+        gf, gag = (gh, ga) if our_home else (ga, gh)
+        rows.append({
+            "fixture_id": fid,
+            "date": date,
+            "round": rnd,
+            "status": status,
+            "H/A": "H" if our_home else "A",
+            "opponent_id": aid if our_home else hid,
+            "opponent": aname if our_home else hname,
+            "GF": gf,
+            "GA": gag,
+        })
+
+    cols = ["fixture_id", "date", "round", "status", "H/A", "opponent_id", "opponent", "GF", "GA"]
+    df = pd.DataFrame(rows, columns=cols)
+    df = df.join(wide, on="fixture_id")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["fixture_id"] = df["fixture_id"].astype("int64")
+    df["GF"], df["GA"] = to_numeric(df["GF"]), to_numeric(df["GA"])
+    df[["GF", "GA"] + STAT_COLUMNS] = df[["GF", "GA"] + STAT_COLUMNS].astype("float64")
+    df["result"] = np.select([df["GF"] > df["GA"], df["GF"] < df["GA"]], ["V", "D"], default="E")
+    df = df.sort_values("date").reset_index(drop=True)
+    if not complete:
+        raise _Incomplete(df)
+    return df
+
+def season_match_facts(team_id: int, season: int, fixtures=None, last_n: int | None = None,
+                       on_progress=None) -> pd.DataFrame:
+    """
+    Tabela de fatos por jogo (só finalizados) na perspectiva de `team_id`:
+    GF/GA, resultado e todas as estatísticas normalizadas de ambos os lados
+    (`<métrica>_for` / `<métrica>_against`), ordenada por data.
+    Cacheada pelo conjunto (fixture_id, status, placar…) e pelo 'Atualizar
+    agora' — muda só quando um jogo termina ou é corrigido. Se a estatística
+    de algum jogo não pôde ser obtida, o resultado não entra no cache.
+    """
+    if fixtures is None:
+        fixtures = api_client.fixtures(team_id, season) or []
+    finals = [
+        fx for fx in fixtures
+        if ((fx.get("fixture") or {}).get("status") or {}).get("short") in FINAL_STATUSES
+    ]
+    finals = sorted(finals, key=lambda fx: str((fx.get("fixture") or {}).get("date") or ""))
+    if last_n:
+        finals = finals[-last_n:]
+    key = tuple(_fixture_key(fx) for fx in finals)
+    # garante os detalhes no cache antes (barato quando já está tudo lá)
+    api_client.hydrate_fixtures([k[0] for k in key], on_progress=on_progress)
+    return _uncached_if_incomplete(_build, team_id, key, refresh_nonce())
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_league(fixtures_key: tuple, nonce: int) -> pd.DataFrame:
+    stats, complete = _statistics(fixtures_key)
+    wide = pivot_statistics(stats)
+    rows = []
+    for fid, status, date, hid, hname, aid, aname, gh, ga, rnd in fixtures_key:
+        # uma linha por time em cada jogo
+        for tid, tname, oid, oname, ha, gf, gag in (
+            (hid, hname, aid, aname, "H", gh, ga),
+            (aid, aname, hid, hname, "A", ga, gh),
+        ):
+            rows.append({
+                "fixture_id": fid, "team_id": tid, "team": tname,
+                "date": date, "round": rnd, "status": status, "H/A": ha,
+                "opponent_id": oid, "opponent": oname,
+                "GF": gf, "GA": gag,
+            })
+    df = pd.DataFrame(rows, columns=["fixture_id", "team_id", "team", "date", "round", "status", "H/A",
+                                     "opponent_id", "opponent", "GF", "GA"])
+    df = df.join(wide, on=["fixture_id", "team_id"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["GF"], df["GA"] = to_numeric(df["GF"]), to_numeric(df["GA"])
+    df[["GF", "GA"] + STAT_COLUMNS] = df[["GF", "GA"] + STAT_COLUMNS].astype("float64")
+    df["result"] = np.select([df["GF"] > df["GA"], df["GF"] < df["GA"]], ["V", "D"], default="E")
+    df = df.sort_values(["team_id", "date"]).reset_index(drop=True)
+    if not complete:
+        raise _Incomplete(df)
+    return df
+
+def league_match_facts(league_id: int, season: int, on_progress=None) -> pd.DataFrame:
+    """
+    Mesma tabela de season_match_facts, mas para a liga inteira: uma linha por
+    (jogo finalizado, time), ordenada por time e data. Base: 1 chamada de
+    /fixtures da liga + lotes /fixtures?ids= para as estatísticas.
+    """
+    fixtures = api_client.league_fixtures(league_id, season) or []
+    finals = [
+        fx for fx in fixtures
+        if ((fx.get("fixture") or {}).get("status") or {}).get("short") in FINAL_STATUSES
+    ]
+    key = tuple(_fixture_key(fx) for fx in finals)
+    api_client.hydrate_fixtures([k[0] for k in key], on_progress=on_progress)
+    return _uncached_if_incomplete(_build_league, key, refresh_nonce())
@@ -0,0 +1,78 @@
+# core/models/poisson.py
+import numpy as np
+
+MAX_GOALS = 10  # com λ típico de futebol (< 3) a cauda acima de 10 gols é desprezível
+
+def pmf_matrix(lam, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """P(X = k), k = 0..max_goals, para cada λ: shape (n, max_goals + 1). Sem factorial."""
+    lam = np.atleast_1d(np.asarray(lam, dtype="float64"))
+    k = np.arange(1, max_goals + 1)
+    # p_k = p_{k-1} * λ / k  →  produto acumulado a partir de e^{-λ}
+    ratios = lam[:, None] / k[None, :]
+    out = np.empty((lam.size, max_goals + 1))
+    out[:, 0] = np.exp(-lam)
+    out[:, 1:] = out[:, [0]] * np.cumprod(ratios, axis=1)
+    return out
+
+def _dixon_coles(grid: np.ndarray, lam_home: np.ndarray, lam_away: np.ndarray, rho) -> np.ndarray:
+    """Correção de Dixon-Coles nos placares baixos (0-0, 1-0, 0-1, 1-1)."""
+    rho = np.broadcast_to(np.asarray(rho, dtype="float64"), lam_home.shape)
+    grid = grid.copy()
+    grid[:, 0, 0] *= 1 - lam_home * lam_away * rho
+    grid[:, 0, 1] *= 1 + lam_home * rho
+    grid[:, 1, 0] *= 1 + lam_away * rho
+    grid[:, 1, 1] *= 1 - rho
+    return np.clip(grid, 0, None)
+
+def score_grids(lam_home, lam_away, max_goals: int = MAX_GOALS, rho=0.0) -> np.ndarray:
+    """
+    Matriz de placares P(casa = i, fora = j) para n jogos: shape (n, G+1, G+1).
+    Produto externo das duas Poisson (vetorizado), correção de Dixon-Coles
+    opcional (rho != 0) e renormalização da cauda truncada.
+    """
+    lh = np.atleast_1d(np.asarray(lam_home, dtype="float64"))
+    la = np.atleast_1d(np.asarray(lam_away, dtype="float64"))
+    lh, la = np.broadcast_arrays(lh, la)
+    grid = pmf_matrix(lh, max_goals)[:, :, None] * pmf_matrix(la, max_goals)[:, None, :]
+    if np.any(np.asarray(rho) != 0):
+        grid = _dixon_coles(grid, lh, la, rho)
+    return grid / grid.sum(axis=(1, 2), keepdims=True)
+
+def predict(lam_home, lam_away, max_goals: int = MAX_GOALS, rho=0.0,
+            lines=(0.5, 1.5, 2.5, 3.5), top_k: int = 6) -> list[dict]:
+    """
+    Probabilidades para n jogos de uma vez. Para cada jogo retorna:
+      p_home / p_draw / p_away, over/under {linha: p}, btts,
+      top_scores [(gols_casa, gols_fora, p), ...] e os λ usados.
+    Escalares também funcionam (lista com 1 item).
+    """
+    grid = score_grids(lam_home, lam_away, max_goals, rho)
+    n, g = grid.shape[0], grid.shape[1]
+    i, j = np.indices((g, g))
+    total = i + j
+
+    p_home = (grid * (i > j)).sum(axis=(1, 2))
+    p_draw = np.trace(grid, axis1=1, axis2=2)
+    p_away = (grid * (i < j)).sum(axis=(1, 2))
+    btts = grid[:, 1:, 1:].sum(axis=(1, 2))
+    over = {line: (grid * (total > line)).sum(axis=(1, 2)) for line in lines}
+
+    flat = grid.reshape(n, -1)
+    top_idx = np.argsort(-flat, axis=1, kind="stable")[:, :top_k]
+    lh = np.broadcast_to(np.atleast_1d(np.asarray(lam_home, dtype="float64")), (n,))
+    la = np.broadcast_to(np.atleast_1d(np.asarray(lam_away, dtype="float64")), (n,))
+
+    out = []
+    for m in range(n):
+        out.append({
+            "lambda_home": float(lh[m]),
+            "lambda_away": float(la[m]),
+            "p_home": float(p_home[m]),
+            "p_draw": float(p_draw[m]),
+            "p_away": float(p_away[m]),
+            "over": {line: float(over[line][m]) for line in lines},
+            "under": {line: float(1 - over[line][m]) for line in lines},
+            "btts": float(btts[m]),
+            "top_scores": [(int(k // g), int(k % g), float(flat[m, k])) for k in top_idx[m]],
+        })
+    return out
@@ -0,0 +1,232 @@
+# core/models/season_sim.py
+import hashlib
+
+import numpy as np
+import streamlit as st
+
+from core import api_client
+from core.cache import FINAL_STATUSES
+from core.models import poisson, strength
+
+VOID_STATUSES = {"CANC", "ABD", "AWD", "WO"}  # não entram na simulação
+
+PROMOTION_SLOTS = 4   # Série B: sobem os 4 primeiros
+RELEGATION_SLOTS = 4  # caem os 4 últimos
+MAX_GOALS = 9         # placar amostrado como índice único (G+1)² <= 255 → cabe em uint8
+CHUNK = 32            # jogos amostrados por vez (limita a memória dos sorteios)
+U_BITS = 16           # sorteio em inteiros de 16 bits: probabilidades quantizadas em 1/65536
+
+def _sample(cdf: np.ndarray, n_sims: int, rng) -> np.ndarray:
+    """
+    Índices de placar sorteados para c jogos × n_sims por tabela de consulta
+    completa: cada jogo vira uma tabela de 2**U_BITS posições (placar i ocupa
+    ~p_i · 65536 delas) e o sorteio é um uint16 uniforme usado como índice —
+    sem float e sem busca. O erro de quantização (≤ 1/65536 por placar) fica
+    bem abaixo do erro de Monte Carlo com 100k simulações (~1e-3).
+    """
+    c, k = cdf.shape
+    size = 1 << U_BITS
+    bounds = np.rint(cdf * size).astype(np.int64)
+    bounds[:, -1] = size
+    counts = np.diff(bounds, axis=1, prepend=0)
+    lut = np.stack([np.repeat(np.arange(k, dtype=np.uint8), row) for row in counts])
+    u = rng.integers(0, size, (c, n_sims), dtype=np.uint16)
+    out = np.empty((c, n_sims), dtype=np.uint8)
+    for i in range(c):
+        out[i] = lut[i][u[i]]
+    return out
+
+GD_OFFSET = MAX_GOALS  # saldo por jogo + offset >= 0 para caber no campo empacotado
+
+def _packed_tables(g: int):
+    """
+    Por índice de placar (hg·g + ag), mandante e visitante: pontos, vitória e
+    saldo empacotados num int32 (bits 0-9, 10-19 e 20-30). Somar os códigos dos
+    jogos de um time soma as três estatísticas de uma vez (cabe até 56 jogos).
+    """
+    hg, ag = np.divmod(np.arange(g * g), g)
+    hw, aw, dr = hg > ag, ag > hg, hg == ag
+    home = (3 * hw + dr) | (hw.astype(int) << 10) | ((hg - ag + GD_OFFSET) << 20)
+    away = (3 * aw + dr) | (aw.astype(int) << 10) | ((ag - hg + GD_OFFSET) << 20)
+    return home.astype(np.int32), away.astype(np.int32)
+
+class SeasonSim:
+    """
+    Monte Carlo da temporada, todo em arrays numpy (times × simulações).
+
+    As partidas restantes são sorteadas uma única vez (placar por jogo e por
+    simulação, uint8) e somadas à tabela atual. `project(locks)` só recalcula
+    a contribuição dos jogos travados ("e se ganharmos do Goiás?") e refaz a
+    classificação — não ressorteia nada, então é barato e o objeto pode ser
+    compartilhado entre sessões (não é modificado).
+    """
+
+    def __init__(self, teams, base, home, away, grids, n_sims: int = 100_000, seed: int = 0):
+        self.teams = list(teams)
+        self.n_sims = int(n_sims)
+        self.home = np.asarray(home, dtype=int)
+        self.away = np.asarray(away, dtype=int)
+        n, s = len(self.teams), self.n_sims
+        g = grids.shape[1]
+        self._g = g
+
+        # tabela atual (pontos, vitórias, saldo), repetida em cada simulação
+        self.pts = np.repeat(np.asarray(base["pts"], dtype=np.int16)[:, None], s, axis=1)
+        self.wins = np.repeat(np.asarray(base["wins"], dtype=np.int16)[:, None], s, axis=1)
+        self.gd = np.repeat(np.asarray(base["gd"], dtype=np.int16)[:, None], s, axis=1)
+
+        rng = np.random.default_rng(seed)
+        # desempate final aleatório (sorteio), fixo para todas as projeções
+        self._tiebreak = rng.random((n, s), dtype=np.float32)
+
+        # amostragem por CDF inversa da grade de placares, em blocos de jogos
+        m_total = len(self.home)
+        self.scores = np.empty((m_total, s), dtype=np.uint8)
+        cdf_all = grids.reshape(m_total, -1).cumsum(axis=1)
+        for start in range(0, m_total, CHUNK):
+            cdf = cdf_all[start:start + CHUNK]
+            self.scores[start:start + len(cdf)] = _sample(cdf / cdf[:, -1:], s, rng)
+
+        # soma dos jogos por time: 1 consulta int32 por jogo e lado (pts, vitórias e saldo juntos)
+        home_code, away_code = _packed_tables(g)
+        packed = np.zeros((n, s), dtype=np.int32)
+        for m in range(m_total):
+            sc = self.scores[m]
+            packed[self.home[m]] += home_code[sc]
+            packed[self.away[m]] += away_code[sc]
+        games = np.bincount(self.home, minlength=n) + np.bincount(self.away, minlength=n)
+        self.pts += (packed & 1023).astype(np.int16)
+        self.wins += ((packed >> 10) & 1023).astype(np.int16)
+        self.gd += ((packed >> 20) - GD_OFFSET * games[:, None]).astype(np.int16)
+
+    def _apply(self, m: int, score, pts, wins, gd, sign: int = 1):
+        """Soma (sign=1) ou remove (sign=-1) o resultado do jogo m das tabelas."""
+        hg = (score // self._g).astype(np.int16)
+        ag = (score % self._g).astype(np.int16)
+        h, a = self.home[m], self.away[m]
+        hw, aw, dr = hg > ag, ag > hg, hg == ag
+        pts[h] += sign * (3 * hw + dr).astype(np.int16)
+        pts[a] += sign * (3 * aw + dr).astype(np.int16)
+        wins[h] += sign * hw.astype(np.int16)
+        wins[a] += sign * aw.astype(np.int16)
+        gd[h] += sign * (hg - ag)
+        gd[a] += sign * (ag - hg)
+
+    def project(self, locks: dict | None = None) -> dict:
+        """
+        Probabilidades finais. `locks` = {índice do jogo: (gols_casa, gols_fora)}.
+        Retorna teams, p_title, p_promotion, p_relegation, exp_points,
+        exp_position e positions (times × posições, probabilidade).
+        """
+        pts, wins, gd = self.pts, self.wins, self.gd
+        if locks:
+            pts, wins, gd = pts.copy(), wins.copy(), gd.copy()
+            for m, (hg, ag) in locks.items():
+                hg, ag = min(int(hg), self._g - 1), min(int(ag), self._g - 1)
+                self._apply(m, self.scores[m], pts, wins, gd, sign=-1)
+                fixed = np.full(self.n_sims, hg * self._g + ag, dtype=np.uint8)
+                self._apply(m, fixed, pts, wins, gd, sign=1)
+
+        # critérios: pontos > vitórias > saldo > sorteio (chave única em float64)
+        key = (pts.astype(np.float64) * 1e6 + wins.astype(np.float64) * 1e3
+               + (gd.astype(np.float64) + 500) + self._tiebreak)
+        order = np.argsort(-key, axis=0)
+        n = len(self.teams)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(n)[:, None], axis=0)
+
+        positions = np.stack([(rank == r).mean(axis=1) for r in range(n)], axis=1)
+        return {
+            "teams": self.teams,
+            "p_title": positions[:, 0],
+            "p_promotion": positions[:, :PROMOTION_SLOTS].sum(axis=1),
+            "p_relegation": positions[:, n - RELEGATION_SLOTS:].sum(axis=1),
+            "exp_points": pts.mean(axis=1),
+            "exp_position": rank.mean(axis=1) + 1,
+            "positions": positions,
+        }
+
+# -------------------- montagem a partir dos jogos da liga --------------------
+def from_fixtures(fixtures, model: dict | None = None, n_sims: int = 100_000,
+                  seed: int = 0, rho: float = 0.0):
+    """
+    Monta o simulador com o payload de /fixtures da liga: tabela atual pelos
+    jogos finalizados e grades de placar (Poisson) dos restantes, com λ do
+    modelo de forças (core/models/strength.py). Sem modelo, usa a média da liga.
+    Retorna (SeasonSim, restantes) — `restantes` lista os jogos na ordem dos
+    índices aceitos por `project(locks)`.
+    """
+    teams, names = [], {}
+    finals, remaining = [], []
+    for fx in fixtures or []:
+        f = fx.get("fixture") or {}
+        status = (f.get("status") or {}).get("short")
+        t = fx.get("teams") or {}
+        hid, aid = (t.get("home") or {}).get("id"), (t.get("away") or {}).get("id")
+        if hid is None or aid is None or status in VOID_STATUSES:
+            continue
+        for side in ("home", "away"):
+            tm = t.get(side) or {}
+            if tm.get("id") not in names:
+                teams.append(tm.get("id"))
+                names[tm.get("id")] = tm.get("name")
+        g = fx.get("goals") or {}
+        if status in FINAL_STATUSES and g.get("home") is not None and g.get("away") is not None:
+            finals.append((hid, aid, int(g["home"]), int(g["away"])))
+        else:
+            remaining.append({
+                "fixture_id": f.get("id"), "date": f.get("date"),
+                "round": (fx.get("league") or {}).get("round"),
+                "home_id": hid, "home": names.get(hid), "away_id": aid, "away": names.get(aid),
+            })
+
+    pos = {tid: i for i, tid in enumerate(teams)}
+    n = len(teams)
+    base = {"pts": np.zeros(n, int), "wins": np.zeros(n, int), "gd": np.zeros(n, int)}
+    if finals:
+        h, a, hg, ag = (np.array(c) for c in zip(*finals))
+        h, a = np.vectorize(pos.get)(h), np.vectorize(pos.get)(a)
+        base["pts"] = (np.bincount(h, 3 * (hg > ag) + (hg == ag), n)
+                       + np.bincount(a, 3 * (ag > hg) + (hg == ag), n)).astype(int)
+        base["wins"] = (np.bincount(h, hg > ag, n) + np.bincount(a, ag > hg, n)).astype(int)
+        base["gd"] = (np.bincount(h, hg - ag, n) + np.bincount(a, ag - hg, n)).astype(int)
+
+    lam_h, lam_a = [], []
+    default = (model["mu"] * model["home"], model["mu"]) if model else (1.3, 1.0)
+    for r in remaining:
+        lams = strength.expected_goals(model, r["home_id"], r["away_id"]) or default
+        lam_h.append(lams[0])
+        lam_a.append(lams[1])
+    grids = (poisson.score_grids(lam_h, lam_a, MAX_GOALS, rho) if remaining
+             else np.zeros((0, MAX_GOALS + 1, MAX_GOALS + 1)))
+
+    sim = SeasonSim(
+        [{"id": tid, "name": names[tid]} for tid in teams], base,
+        [pos[r["home_id"]] for r in remaining], [pos[r["away_id"]] for r in remaining],
+        grids, n_sims=n_sims, seed=seed,
+    )
+    return sim, remaining
+
+def _signature(fixtures) -> str:
+    """Muda só quando algum jogo muda de status/placar (chave do cache do simulador)."""
+    parts = []
+    for fx in fixtures or []:
+        f = fx.get("fixture") or {}
+        g = fx.get("goals") or {}
+        parts.append(f"{f.get('id')}:{(f.get('status') or {}).get('short')}:{g.get('home')}:{g.get('away')}")
+    return hashlib.md5(",".join(sorted(parts)).encode("utf-8")).hexdigest()
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _league_sim(league_id: int, season: int, signature: str, n_sims: int):
+    fixtures = api_client.league_fixtures(league_id, season) or []
+    model = strength.league_strengths(league_id, season)
+    return from_fixtures(fixtures, model, n_sims=n_sims)
+
+def league_sim(league_id: int, season: int, n_sims: int = 100_000):
+    """
+    Simulador da liga/temporada (1 chamada de /fixtures + modelo de forças).
+    Compartilhado entre sessões (cache_resource) e refeito só quando algum
+    jogo termina; travas de resultado vão em `sim.project(locks)`.
+    """
+    fixtures = api_client.league_fixtures(league_id, season) or []
+    return _league_sim(league_id, season, _signature(fixtures), n_sims)
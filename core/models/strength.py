@@ -0,0 +1,131 @@
+# core/models/strength.py
+import hashlib
+import time
+
+import numpy as np
+import streamlit as st
+
+from core import api_client
+from core.cache import FINAL_STATUSES, peek, prime
+
+MODEL_PATH = "/model/strength"  # entrada do cache em disco (não é endpoint da API)
+
+# λ_casa = μ · γ · ataque[casa] · defesa[fora]
+# λ_fora = μ ·     ataque[fora] · defesa[casa]
+# ataque > 1: marca mais que a média; defesa > 1: sofre mais que a média.
+
+def _matches(fixtures) -> dict:
+    """Arrays (ids de time, placares) dos jogos finalizados."""
+    hid, aid, hg, ag, fids = [], [], [], [], []
+    for fx in fixtures or []:
+        f = fx.get("fixture") or {}
+        if (f.get("status") or {}).get("short") not in FINAL_STATUSES:
+            continue
+        t = fx.get("teams") or {}
+        g = fx.get("goals") or {}
+        if g.get("home") is None or g.get("away") is None:
+            continue
+        fids.append(f.get("id"))
+        hid.append((t.get("home") or {}).get("id"))
+        aid.append((t.get("away") or {}).get("id"))
+        hg.append(g["home"])
+        ag.append(g["away"])
+    return {
+        "fixture_ids": fids,
+        "home": np.asarray(hid), "away": np.asarray(aid),
+        "hg": np.asarray(hg, dtype="float64"), "ag": np.asarray(ag, dtype="float64"),
+    }
+
+def fit(matches: dict, init: dict | None = None, prior: float = 1.0,
+        tol: float = 1e-8, max_iter: int = 500) -> dict:
+    """
+    Ajuste por máxima verossimilhança (iterações de ponto fixo de Maher,
+    todas vetorizadas com bincount). `prior` = jogos "fantasmas" na média da
+    liga, que seguram times com poucos jogos perto de 1.
+    `init` (parâmetros de um ajuste anterior) dá o warm start: após uma rodada
+    nova, poucas iterações bastam.
+    """
+    teams = sorted(set(matches["home"].tolist()) | set(matches["away"].tolist()))
+    pos = {t: i for i, t in enumerate(teams)}
+    h = np.array([pos[t] for t in matches["home"].tolist()], dtype=int)
+    a = np.array([pos[t] for t in matches["away"].tolist()], dtype=int)
+    hg, ag = matches["hg"], matches["ag"]
+    n = len(teams)
+
+    att, dfn, gamma, mu = np.ones(n), np.ones(n), 1.0, max(1e-6, (hg.sum() + ag.sum()) / max(1, 2 * len(hg)))
+    if init:
+        prev = {t: i for i, t in enumerate(init.get("teams", []))}
+        for t, i in pos.items():
+            if t in prev:
+                att[i] = init["attack"][prev[t]]
+                dfn[i] = init["defence"][prev[t]]
+        gamma, mu = init.get("home", gamma), init.get("mu", mu)
+
+    scored = np.bincount(h, hg, n) + np.bincount(a, ag, n)
+    conceded = np.bincount(h, ag, n) + np.bincount(a, hg, n)
+    it = 0
+    for it in range(1, max_iter + 1):
+        old = np.concatenate([att, dfn, [gamma, mu]])
+        # ataque: gols marcados / gols esperados com ataque = 1
+        exp_att = np.bincount(h, mu * gamma * dfn[a], n) + np.bincount(a, mu * dfn[h], n)
+        att = (scored + prior) / (exp_att + prior)
+        exp_def = np.bincount(a, mu * gamma * att[h], n) + np.bincount(h, mu * att[a], n)
+        dfn = (conceded + prior) / (exp_def + prior)
+        # normaliza (média geométrica 1) e joga a escala para μ
+        ga, gd = np.exp(np.log(att).mean()), np.exp(np.log(dfn).mean())
+        att, dfn = att / ga, dfn / gd
+        mu *= ga * gd
+        gamma = hg.sum() / max(1e-9, (mu * att[h] * dfn[a]).sum())
+        mu = (hg.sum() + ag.sum()) / max(1e-9, (gamma * att[h] * dfn[a] + att[a] * dfn[h]).sum())
+        new = np.concatenate([att, dfn, [gamma, mu]])
+        if np.max(np.abs(new - old) / np.maximum(np.abs(old), 1e-9)) < tol:
+            break
+
+    return {
+        "teams": teams,
+        "attack": att.tolist(),
+        "defence": dfn.tolist(),
+        "home": float(gamma),
+        "mu": float(mu),
+        "n_matches": int(len(hg)),
+        "iterations": it,
+    }
+
+def expected_goals(params: dict | None, home_id: int, away_id: int) -> tuple[float, float] | None:
+    """(λ_casa, λ_fora) para um confronto; None se algum time não está no modelo."""
+    if not params or home_id not in params.get("teams", []) or away_id not in params["teams"]:
+        return None
+    i, j = params["teams"].index(home_id), params["teams"].index(away_id)
+    att, dfn = params["attack"], params["defence"]
+    lam_home = params["mu"] * params["home"] * att[i] * dfn[j]
+    lam_away = params["mu"] * att[j] * dfn[i]
+    return float(lam_home), float(lam_away)
+
+def _matches_hash(fixture_ids) -> str:
+    s = ",".join(str(f) for f in sorted(fixture_ids))
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _fit_cached(league_id: int, season: int, matches_hash: str, _data: dict) -> dict:
+    params = {"league": league_id, "season": season}
+    prev = (peek(MODEL_PATH, params) or {}).get("data")
+    if prev and prev.get("matches_hash") == matches_hash:
+        return prev
+    # warm start a partir do ajuste anterior persistido (rodada anterior)
+    model = fit(_data, init=prev)
+    model["matches_hash"] = matches_hash
+    model["fitted_at"] = time.time()
+    prime(MODEL_PATH, params, model)
+    return model
+
+def league_strengths(league_id: int, season: int) -> dict | None:
+    """
+    Força de ataque/defesa por time + mando de campo, ajustados com todos os
+    jogos finalizados da liga (1 chamada de /fixtures). Parâmetros ficam no
+    cache em disco por temporada e são reajustados (warm start) quando entra
+    jogo novo.
+    """
+    matches = _matches(api_client.league_fixtures(league_id, season))
+    if len(matches["hg"]) == 0:
+        return None
+    return _fit_cached(league_id, season, _matches_hash(matches["fixture_ids"]), matches)
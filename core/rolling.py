@@ -0,0 +1,50 @@
+# core/rolling.py
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+def valid_mean(values, window: int) -> np.ndarray:
+    """
+    Em cada posição i: média dos últimos `window` valores válidos (não-NaN)
+    até i, inclusive. NaN enquanto não houver nenhum valor válido.
+    Buracos não quebram a janela: ela "pula" o NaN e pega o valor válido anterior.
+    """
+    x = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    mask = ~np.isnan(x)
+    v = x[mask]
+    n_valid = np.cumsum(mask)                # nº de válidos até cada posição
+    out = np.full(x.shape, np.nan)
+    if v.size == 0:
+        return out
+
+    # means[k-1] = média dos últimos min(window, k) válidos quando já há k válidos
+    means = np.empty(v.size)
+    head = min(window, v.size)
+    means[:head] = np.cumsum(v[:head]) / np.arange(1, head + 1)
+    if v.size > window:
+        means[window - 1:] = sliding_window_view(v, window).mean(axis=1)
+
+    seen = n_valid > 0
+    out[seen] = means[n_valid[seen] - 1]
+    return out
+
+def rolling_valid_means(df: pd.DataFrame, columns, windows, by: str | None = None) -> pd.DataFrame:
+    """
+    Médias móveis que ignoram NaN para várias métricas × janelas de uma vez.
+    Retorna um DataFrame (mesmo índice de df) com colunas `<col>_roll<w>`.
+    `by` (ex.: "team_id") calcula a série de cada grupo separadamente, mantendo
+    a ordem das linhas — útil para várias temporadas ou a liga inteira.
+    """
+    out = {}
+    if by is None:
+        groups = [np.arange(len(df))]
+    else:
+        groups = list(df.groupby(by, sort=False).indices.values())
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+        for w in windows:
+            res = np.full(len(df), np.nan)
+            for idx in groups:
+                res[idx] = valid_mean(values[idx], w)
+            out[f"{col}_roll{w}"] = res
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,124 @@
+# core/standings_history.py
+import hashlib
+import re
+
+import pandas as pd
+import streamlit as st
+
+from core import api_client
+from core.cache import FINAL_STATUSES, peek, prime
+
+HISTORY_PATH = "/model/standings_history"  # entrada do cache em disco (não é endpoint da API)
+COLUMNS = ["round", "team_id", "team", "played", "pts", "wins", "draws", "losses", "gf", "ga", "gd", "rank"]
+
+def _round_no(label) -> int | None:
+    """'Regular Season - 12' -> 12"""
+    m = re.search(r"(\d+)\s*$", str(label or ""))
+    return int(m.group(1)) if m else None
+
+def _games(fixtures):
+    """(jogos finalizados com nº da rodada, {team_id: nome}) — nomes de todos os times da liga."""
+    rows, names = [], {}
+    for fx in fixtures or []:
+        f = fx.get("fixture") or {}
+        t = fx.get("teams") or {}
+        h, a = t.get("home") or {}, t.get("away") or {}
+        for tm in (h, a):
+            if tm.get("id") is not None:
+                names.setdefault(tm["id"], tm.get("name"))
+        g = fx.get("goals") or {}
+        rnd = _round_no((fx.get("league") or {}).get("round"))
+        if ((f.get("status") or {}).get("short") not in FINAL_STATUSES or rnd is None
+                or g.get("home") is None or g.get("away") is None):
+            continue
+        rows.append({"fixture_id": f.get("id"), "round": rnd, "home_id": h.get("id"),
+                     "away_id": a.get("id"), "hg": int(g["home"]), "ag": int(g["away"])})
+    games = pd.DataFrame(rows, columns=["fixture_id", "round", "home_id", "away_id", "hg", "ag"])
+    return games, names
+
+def _round_signatures(games: pd.DataFrame) -> dict:
+    """Hash dos resultados de cada rodada: detecta rodada nova ou jogo adiado/corrigido."""
+    sigs = {}
+    for rnd, grp in games.sort_values("fixture_id").groupby("round"):
+        s = grp[["fixture_id", "hg", "ag"]].to_numpy().tobytes()
+        sigs[int(rnd)] = hashlib.md5(s).hexdigest()
+    return sigs
+
+def _accumulate(games: pd.DataFrame, team_ids, rounds, start: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Tabela acumulada após cada rodada de `rounds` (soma por rodada × time e
+    cumsum, tudo vetorizado). `start` = totais por time antes da 1ª rodada.
+    """
+    long = pd.concat([
+        pd.DataFrame({"round": games["round"], "team_id": games["home_id"], "gf": games["hg"], "ga": games["ag"]}),
+        pd.DataFrame({"round": games["round"], "team_id": games["away_id"], "gf": games["ag"], "ga": games["hg"]}),
+    ], ignore_index=True)
+    long["played"] = 1
+    long["wins"] = (long["gf"] > long["ga"]).astype(int)
+    long["draws"] = (long["gf"] == long["ga"]).astype(int)
+    long["losses"] = (long["gf"] < long["ga"]).astype(int)
+    stats = ["played", "wins", "draws", "losses", "gf", "ga"]
+
+    idx = pd.MultiIndex.from_product([list(rounds), list(team_ids)], names=["round", "team_id"])
+    per = long.groupby(["round", "team_id"])[stats].sum().reindex(idx, fill_value=0)
+    # cumsum por time ao longo das rodadas: (rodadas × times) por estatística
+    cum = per.groupby(level="team_id").cumsum()
+    if start is not None and not start.empty:
+        cum = cum.add(start.reindex(team_ids, fill_value=0)[stats], level="team_id")
+    cum = cum.reset_index()
+    cum["pts"] = 3 * cum["wins"] + cum["draws"]
+    cum["gd"] = cum["gf"] - cum["ga"]
+    return cum
+
+def _rank(table: pd.DataFrame) -> pd.DataFrame:
+    """Posição em cada rodada: pontos > vitórias > saldo > gols pró."""
+    table = table.sort_values(["round", "pts", "wins", "gd", "gf"],
+                              ascending=[True, False, False, False, False], kind="stable")
+    table["rank"] = table.groupby("round").cumcount() + 1
+    return table
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _history_cached(league_id: int, season: int, signature: str, _data: pd.DataFrame, _names: dict) -> pd.DataFrame:
+    params = {"league": league_id, "season": season}
+    sigs = _round_signatures(_data)
+    rounds = list(range(1, max(sigs) + 1))
+    team_ids = sorted(_names)
+
+    prev = (peek(HISTORY_PATH, params) or {}).get("data") or {}
+    prev_sigs = {int(k): v for k, v in (prev.get("sigs") or {}).items()}
+    prev_rows = pd.DataFrame(prev.get("rows") or [], columns=COLUMNS)
+    if prev_rows.empty or set(prev_rows["team_id"]) != set(team_ids):
+        first = rounds[0]
+    else:
+        # primeira rodada que mudou (nova, adiada ou corrigida) — o que vem antes é reaproveitado
+        first = next((r for r in sorted(set(rounds) | set(prev_sigs)) if sigs.get(r) != prev_sigs.get(r)), None)
+        if first is None:
+            return prev_rows
+    kept = prev_rows[prev_rows["round"] < first]
+    start = kept[kept["round"] == first - 1].set_index("team_id") if not kept.empty else None
+
+    todo = [r for r in rounds if r >= first]
+    fresh = _accumulate(_data[_data["round"] >= first], team_ids, todo, start)
+    table = pd.concat([kept.drop(columns=["team", "rank"]), fresh], ignore_index=True)
+    table["team"] = table["team_id"].map(_names)
+    table = _rank(table)[COLUMNS].reset_index(drop=True)
+    ints = [c for c in COLUMNS if c != "team"]
+    table[ints] = table[ints].astype(int)
+
+    prime(HISTORY_PATH, params, {"sigs": {str(k): v for k, v in sigs.items()},
+                                 "rows": table.to_dict("records")})
+    return table
+
+def standings_history(league_id: int, season: int) -> pd.DataFrame:
+    """
+    Tabela de classificação após cada rodada, reconstruída de 1 chamada de
+    /fixtures da liga: uma linha por (rodada, time) com J/V/E/D, gols,
+    pontos, saldo e posição. Fica no cache em disco e é estendida só a partir
+    da primeira rodada que mudou.
+    """
+    games, names = _games(api_client.league_fixtures(league_id, season))
+    if games.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    sigs = _round_signatures(games)
+    signature = hashlib.md5(repr(sorted(sigs.items())).encode("utf-8")).hexdigest()
+    return _history_cached(league_id, season, signature, games, names)
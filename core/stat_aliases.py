@@ -0,0 +1,104 @@
+# core/stat_aliases.py
+from functools import lru_cache
+
+import pandas as pd
+
+# chave canônica -> aliases (minúsculos) do campo "type" de /fixtures/statistics.
+# A ordem dos aliases é a prioridade quando o mesmo jogo traz mais de um.
+ALIASES = {
+    "shots":           ["total shots", "shots total", "shots"],
+    "sot":             ["shots on goal", "shots on target", "sot"],
+    "shots_off":       ["shots off goal", "shots off target"],
+    "shots_blocked":   ["blocked shots"],
+    "shots_inside":    ["shots insidebox", "shots inside box"],
+    "shots_outside":   ["shots outsidebox", "shots outside box"],
+    "poss":            ["ball possession", "possession", "ball possession %"],
+    "passes":          ["total passes"],
+    "passes_accurate": ["passes accurate", "accurate passes"],
+    "pass_pct":        ["passes %", "accurate passes %"],
+    "corners":         ["corner kicks", "corners"],
+    "offsides":        ["offsides"],
+    "fouls":           ["fouls"],
+    "yellow":          ["yellow cards"],
+    "red":             ["red cards"],
+    "saves":           ["goalkeeper saves"],
+    "xg":              ["expected_goals", "expected goals"],
+}
+
+KEYS = list(ALIASES)
+STAT_COLUMNS = [f"{k}_{side}" for k in KEYS for side in ("for", "against")]
+
+# alias exato -> (chave, prioridade); montado uma vez no import
+_EXACT = {a: (k, i) for k, aliases in ALIASES.items() for i, a in enumerate(aliases)}
+_PREFIX_RANK = 99  # casamento só por prefixo perde para qualquer alias exato
+
+@lru_cache(maxsize=512)
+def resolve(type_str: str) -> tuple[str | None, int]:
+    """
+    'Ball Possession' -> ("poss", 0). Tenta alias exato e depois prefixo
+    (algumas ligas trocam sufixos). Memoizado: cada string é resolvida 1x por processo.
+    """
+    t = (type_str or "").strip().lower()
+    if t in _EXACT:
+        return _EXACT[t]
+    for k, aliases in ALIASES.items():
+        if any(t.startswith(a) for a in aliases):
+            return k, _PREFIX_RANK
+    return None, _PREFIX_RANK
+
+def to_numeric(values: pd.Series) -> pd.Series:
+    """'55%' -> 55.0, '12' -> 12.0, None/lixo -> NaN (vetorizado)."""
+    s = values.astype("string").str.replace("%", "", regex=False).str.strip()
+    return pd.to_numeric(s, errors="coerce").astype("float64")
+
+def pivot_statistics(details: dict, team_id: int | None = None) -> pd.DataFrame:
+    """
+    Converte {fixture_id: [bloco por time de /fixtures/statistics]} numa tabela larga
+    com `<chave>_for` / `<chave>_against` (STAT_COLUMNS).
+    - team_id informado: índice fixture_id, na perspectiva desse time;
+    - team_id=None: índice (fixture_id, team_id), uma linha por time em cada jogo.
+    """
+    fids, owners, sides, types, values = [], [], [], [], []
+    for fid, blocks in (details or {}).items():
+        blocks = [b for b in (blocks or []) if (b.get("team") or {}).get("id") is not None]
+        tids = [b["team"]["id"] for b in blocks]
+        for b, tid in zip(blocks, tids):
+            opp = next((o for o in tids if o != tid), None)
+            for it in b.get("statistics") or []:
+                # a mesma estatística vale como "for" do dono e "against" do rival
+                for owner, side in ((tid, "for"), (opp, "against")):
+                    if owner is None:
+                        continue
+                    fids.append(fid)
+                    owners.append(owner)
+                    sides.append(side)
+                    types.append(it.get("type"))
+                    values.append(it.get("value"))
+
+    index_names = ["fixture_id"] if team_id is not None else ["fixture_id", "team_id"]
+    if not fids:
+        empty = pd.DataFrame(columns=index_names + STAT_COLUMNS).astype({c: "float64" for c in STAT_COLUMNS})
+        return empty.set_index(index_names)
+
+    long = pd.DataFrame({"fixture_id": fids, "team_id": owners, "side": sides, "type": types, "value": values})
+    if team_id is not None:
+        long = long[long["team_id"] == team_id]
+
+    # resolve cada string distinta de "type" uma vez só
+    uniq = long["type"].astype("string").fillna("").unique()
+    lookup = {t: resolve(t) for t in uniq}
+    resolved = long["type"].astype("string").fillna("").map(lookup)
+    long["key"] = resolved.str[0]
+    long["rank"] = resolved.str[1]
+    long = long.dropna(subset=["key"])
+    long["value"] = to_numeric(long["value"])
+    long["col"] = long["key"] + "_" + long["side"]
+
+    # se o jogo trouxe dois aliases da mesma chave, fica o de maior prioridade
+    long = long.sort_values("rank", kind="stable").drop_duplicates(["fixture_id", "team_id", "col"])
+    wide = long.pivot(index=["fixture_id", "team_id"], columns="col", values="value")
+    wide = wide.reindex(columns=STAT_COLUMNS).astype("float64")
+    wide.columns.name = None
+    if team_id is not None:
+        wide = wide.droplevel("team_id")
+    return wide
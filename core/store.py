@@ -0,0 +1,125 @@
+# core/store.py
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Diretório do cache persistente (pode ser trocado via env)
+CACHE_DIR = os.environ.get(
+    "CORITIBA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+DB_PATH = os.path.join(CACHE_DIR, "api_store.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    path       TEXT NOT NULL,
+    params     TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS final_fixtures (
+    fixture_id INTEGER PRIMARY KEY,
+    status     TEXT NOT NULL,
+    final_at   REAL NOT NULL
+);
+"""
+
+_local = threading.local()
+
+def _conn() -> sqlite3.Connection:
+    """
+    Uma conexão SQLite por thread (sqlite3 não compartilha conexões entre threads).
+    WAL permite leitores concorrentes enquanto outro processo escreve.
+    """
+    con = getattr(_local, "con", None)
+    if con is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        con = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA busy_timeout=30000")
+        con.executescript(_SCHEMA)
+        _local.con = con
+    return con
+
+def get(key: str) -> dict | None:
+    """Retorna {"data", "fetched_at"} ou None se a chave não existir."""
+    try:
+        row = _conn().execute(
+            "SELECT data, fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if not row:
+        return None
+    try:
+        return {"data": json.loads(row[0]), "fetched_at": row[1]}
+    except ValueError:
+        return None
+
+def fetched_at(key: str) -> float | None:
+    """Só o timestamp da entrada (sem decodificar o payload)."""
+    try:
+        row = _conn().execute(
+            "SELECT fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+def put(key: str, path: str, params: dict, data, fetched_at: float | None = None) -> float:
+    """Grava (ou substitui) uma entrada. Retorna o fetched_at gravado."""
+    ts = fetched_at if fetched_at is not None else time.time()
+    try:
+        _conn().execute(
+            "INSERT OR REPLACE INTO responses (key, path, params, data, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (
+                key,
+                path,
+                json.dumps(params, sort_keys=True, ensure_ascii=False),
+                json.dumps(data, ensure_ascii=False),
+                ts,
+            ),
+        )
+    except sqlite3.Error:
+        pass  # o cache em disco é best-effort: falhar aqui não pode derrubar a página
+    return ts
+
+def clear() -> int:
+    """Apaga todas as respostas guardadas (força buscar tudo de novo). Retorna quantas."""
+    try:
+        return _conn().execute("DELETE FROM responses").rowcount
+    except sqlite3.Error:
+        return 0
+
+# -------------------- jogos encerrados (payload imutável) --------------------
+def mark_final(fixtures: dict[int, str], final_at: float | None = None):
+    """
+    Registra {fixture_id: status} de jogos encerrados (FT/AET/PEN).
+    final_at = quando o encerramento foi visto (fetched_at do /fixtures); fica
+    o da primeira vez — só dados baixados a partir dele são imutáveis.
+    """
+    if not fixtures:
+        return
+    ts = final_at if final_at is not None else time.time()
+    try:
+        _conn().executemany(
+            "INSERT INTO final_fixtures (fixture_id, status, final_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(fixture_id) DO UPDATE SET status = excluded.status",
+            [(int(fid), st, ts) for fid, st in fixtures.items()],
+        )
+    except (sqlite3.Error, TypeError, ValueError):
+        pass
+
+def final_since(fixture_id) -> float | None:
+    """Quando o jogo foi visto encerrado pela 1ª vez (None se não encerrou)."""
+    try:
+        row = _conn().execute(
+            "SELECT final_at FROM final_fixtures WHERE fixture_id = ?", (int(fixture_id),)
+        ).fetchone()
+    except (sqlite3.Error, TypeError, ValueError):
+        return None
+    return row[0] if row else None
@@ -1,30 +1,148 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image, ImageDraw
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import io
+import os
+import threading
+import time
+
+from core import store
+
+IMAGE_DIR = os.path.join(store.CACHE_DIR, "images")  # variantes já redimensionadas (png)
+MEMORY_MAX = 512  # variantes (url, tamanho) mantidas em memória (LRU)
+_MISSING = b""    # marca de falha (download/decodificação)
+MISSING_TTL = 5 * 60  # s até tentar de novo uma imagem que falhou
+
+# -------------------- Sessão HTTP das imagens (pool) --------------------
+@st.cache_resource
+def _image_session():
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=1)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"User-Agent": "coritiba-analytics-ai/1.0"})
+    return s
+
+# -------------------- Cache em memória (LRU) --------------------
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+def _mem_get(key):
+    """PNG em memória, _MISSING se falhou há pouco, None se precisa buscar."""
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        data, failed_at = entry
+        if failed_at is not None and time.time() - failed_at >= MISSING_TTL:
+            del _memory[key]  # falha expirada: tenta de novo
+            return None
+        _memory.move_to_end(key)
+        return data
+
+def _mem_put(key, data: bytes):
+    with _memory_lock:
+        _memory[key] = (data, None if data else time.time())
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX:
+            _memory.popitem(last=False)
+
+# -------------------- Disco + download --------------------
+def _disk_path(url: str, size: int) -> str:
+    h = hashlib.sha1(f"{size}:{url}".encode("utf-8")).hexdigest()
+    return os.path.join(IMAGE_DIR, f"{h}.png")
+
+def _fetch(url: str, size: int) -> bytes:
+    """Baixa, decodifica e redimensiona; devolve o PNG pronto (ou _MISSING)."""
+    try:
+        r = _image_session().get(url, timeout=10)
+        if not r.ok:
+            return _MISSING
+        img = Image.open(io.BytesIO(r.content)).convert("RGBA")
+        img = img.resize((size, size), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        data = buf.getvalue()
+    except Exception:
+        return _MISSING
+    try:
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        tmp = _disk_path(url, size) + f".{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, _disk_path(url, size))
+    except OSError:
+        pass  # disco é best-effort
+    return data
+
+def get_image(url: str, size: int = 32) -> bytes | None:
+    """
+    PNG já redimensionado para (url, size): memória → disco → download.
+    None se a imagem não puder ser obtida (falhas ficam em memória por MISSING_TTL).
+    """
+    if not url:
+        return None
+    key = (url, size)
+    data = _mem_get(key)
+    if data is None:
+        try:
+            with open(_disk_path(url, size), "rb") as fh:
+                data = fh.read()
+        except OSError:
+            data = _fetch(url, size)
+        _mem_put(key, data)
+    return data or None
+
+def prefetch_images(urls, size: int = 32, max_workers: int = 8) -> int:
+    """
+    Baixa em paralelo (sessão com pool) as imagens que não estão em memória
+    nem em disco. Chamar antes de renderizar listas de fotos/logos.
+    Retorna quantas foram baixadas.
+    """
+    todo = []
+    for url in dict.fromkeys(u for u in urls if u):
+        key = (url, size)
+        if _mem_get(key) is not None:
+            continue
+        path = _disk_path(url, size)
+        if os.path.exists(path):
+            continue
+        todo.append(url)
+    if not todo:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(todo))) as pool:
+        for url, data in zip(todo, pool.map(lambda u: _fetch(u, size), todo)):
+            _mem_put((url, size), data)
+    return len(todo)
+
+@lru_cache(maxsize=256)
+def _placeholder(initials: str, size: int) -> bytes:
+    canvas = Image.new("RGB", (size, size), "#ccc")
+    d = ImageDraw.Draw(canvas)
+    d.text((size // 3, size // 3), initials, fill="black")
+    buf = io.BytesIO()
+    canvas.save(buf, format="PNG")
+    return buf.getvalue()
 
 def load_image(url: str, size: int = 32, alt: str = "img", radius: int = 4):
     """
     Carrega imagem de uma URL e exibe no Streamlit.
+    - Cache por (url, tamanho) em memória (LRU) e em disco: rerun não baixa nada.
     - Se falhar, gera um placeholder com iniciais do alt.
     - Mantém tamanho fixo para consistência visual.
     """
-    try:
-        if url:
-            r = requests.get(url, timeout=10)
-            if r.ok:
-                img = Image.open(io.BytesIO(r.content)).convert("RGBA")
-                img = img.resize((size, size))
-                return st.image(img, width=size, caption=alt)
-    except Exception:
-        pass
+    data = get_image(url, size)
+    if data:
+        return st.image(data, width=size, caption=alt)
 
     # fallback (iniciais em fundo cinza)
-    canvas = Image.new("RGB", (size, size), "#ccc")
-    d = ImageDraw.Draw(canvas)
     initials = alt[:2].upper() if alt else "?"
-    d.text((size // 3, size // 3), initials, fill="black")
-    st.image(canvas, width=size, caption=alt)
+    st.image(_placeholder(initials, size), width=size, caption=alt)
 
 
 def team_badge(name: str, logo_url: str, size: int = 24):
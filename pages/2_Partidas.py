@@ -103,6 +103,105 @@ with col_top[1]:
 
 show = fixtures[: st.session_state[key_limit]]
 
+# ------------------------------------------------------------
+# Detalhes sob demanda (fragment: abrir/fechar não reexecuta a página)
+# ------------------------------------------------------------
+@st.fragment
+def match_details(fixture_id: int, home: dict, away: dict):
+    """
+    Estatísticas + lineups de um jogo. Nada é buscado nem montado enquanto o
+    toggle estiver desligado (st.expander executa o conteúdo mesmo fechado).
+    """
+    if not st.toggle("▸ Ver detalhes", key=f"details_{fixture_id}"):
+        return
+
+    # ----------------- Estatísticas do jogo -----------------
+    st.subheader("Estatísticas do jogo")
+    stats = api_client.fixture_statistics(fixture_id) or []
+    # stats vem como lista com item por time
+    stat_map = {}  # {team_name: {stat_name: value}}
+    for row in stats:
+        t = (row.get("team") or {}).get("name") or "-"
+        for kv in (row.get("statistics") or []):
+            n = kv.get("type")
+            v = kv.get("value")
+            try:
+                if isinstance(v, str) and v.endswith("%"):
+                    v = float(v.strip("%")) / 100.0
+            except Exception:
+                pass
+            stat_map.setdefault(t, {})[n] = v
+
+    # Monta DataFrame lado a lado
+    if stat_map:
+        left_team = home.get("name", "-")
+        right_team = away.get("name", "-")
+        all_keys = sorted(set(list(stat_map.get(left_team, {}).keys()) + list(stat_map.get(right_team, {}).keys())))
+        rows = []
+        for k in all_keys:
+            rows.append({
+                "Métrica": k,
+                left_team: stat_map.get(left_team, {}).get(k, "—"),
+                right_team: stat_map.get(right_team, {}).get(k, "—"),
+            })
+        df_stats = pd.DataFrame(rows)
+        st.dataframe(df_stats, use_container_width=True, hide_index=True)
+    else:
+        st.caption("Sem estatísticas disponíveis para este jogo.")
+
+    st.markdown("---")
+
+    # ----------------- Lineups & formações -----------------
+    st.subheader("Lineups & formações")
+    lineups = api_client.fixture_lineups(fixture_id) or []
+
+    # Indexa por ID de time
+    by_id = {}
+    for l in lineups:
+        tid = (l.get("team") or {}).get("id")
+        by_id[tid] = l
+
+    def render_team_lineup(team_dict):
+        tname = team_dict.get("team", {}).get("name", "-")
+        tlogo = team_dict.get("team", {}).get("logo")
+        formation = team_dict.get("formation", "-")
+        starters = [p.get("player", {}).get("name") for p in (team_dict.get("startXI") or [])]
+        subs = [p.get("player", {}).get("name") for p in (team_dict.get("substitutes") or [])]
+
+        # Chip + formação badge
+        cc1, cc2 = st.columns([4, 1])
+        with cc1:
+            team_chip(tname, tlogo, size=28)
+        with cc2:
+            st.markdown(
+                f"<div style='display:inline-block;padding:4px 8px;border-radius:8px;background:#1f2937;color:#fff;font-size:12px;'>formação: <b>{formation}</b></div>",
+                unsafe_allow_html=True,
+            )
+        st.markdown("**Titulares:**")
+        grid_names(starters, cols=5)
+        if subs:
+            with st.expander("Ver banco de reservas"):
+                grid_names(subs, cols=5)
+
+    # Render dos dois times (Evita quebras verticais)
+    left_l, right_l = st.columns(2)
+    with left_l:
+        render_team_lineup(by_id.get(home.get("id"), {}))
+    with right_l:
+        render_team_lineup(by_id.get(away.get("id"), {}))
+
+    # ----------------- Eventos (opcional, curto) ------------
+    # (mantemos simples para não pesar)
+    # events = api_client.fixture_events(fixture_id) or []
+    # if events:
+    #     st.subheader("Eventos")
+    #     tiny = [{"min": e.get("time", {}).get("elapsed"), 
+    #              "team": (e.get("team") or {}).get("name"),
+    #              "player": (e.get("player") or {}).get("name"),
+    #              "type": e.get("type"),
+    #              "detail": e.get("detail")} for e in events]
+    #     st.dataframe(pd.DataFrame(tiny), use_container_width=True, hide_index=True)
+
 # ------------------------------------------------------------
 # Render por jogo
 # ------------------------------------------------------------
@@ -155,97 +254,11 @@ for fx in show:
         pass
 
     # --------------------------------------------------------
-    # Expander de detalhes
+    # Detalhes (carregados só quando abertos)
     # --------------------------------------------------------
-    with st.expander("▸ Ver detalhes", expanded=False):
-        # ----------------- Estatísticas do jogo -----------------
-        st.subheader("Estatísticas do jogo")
-        stats = api_client.fixture_statistics(fix.get("id")) or []
-        # stats vem como lista com item por time
-        stat_map = {}  # {team_name: {stat_name: value}}
-        for row in stats:
-            t = (row.get("team") or {}).get("name") or "-"
-            for kv in (row.get("statistics") or []):
-                n = kv.get("type")
-                v = kv.get("value")
-                try:
-                    if isinstance(v, str) and v.endswith("%"):
-                        v = float(v.strip("%")) / 100.0
-                except Exception:
-                    pass
-                stat_map.setdefault(t, {})[n] = v
-
-        # Monta DataFrame lado a lado
-        if stat_map:
-            left_team = home.get("name", "-")
-            right_team = away.get("name", "-")
-            all_keys = sorted(set(list(stat_map.get(left_team, {}).keys()) + list(stat_map.get(right_team, {}).keys())))
-            rows = []
-            for k in all_keys:
-                rows.append({
-                    "Métrica": k,
-                    left_team: stat_map.get(left_team, {}).get(k, "—"),
-                    right_team: stat_map.get(right_team, {}).get(k, "—"),
-                })
-            df_stats = pd.DataFrame(rows)
-            st.dataframe(df_stats, use_container_width=True, hide_index=True)
-        else:
-            st.caption("Sem estatísticas disponíveis para este jogo.")
-
-        st.markdown("---")
-
-        # ----------------- Lineups & formações -----------------
-        st.subheader("Lineups & formações")
-        lineups = api_client.fixture_lineups(fix.get("id")) or []
-
-        # Indexa por ID de time
-        by_id = {}
-        for l in lineups:
-            tid = (l.get("team") or {}).get("id")
-            by_id[tid] = l
-
-        def render_team_lineup(team_dict):
-            tname = team_dict.get("team", {}).get("name", "-")
-            tlogo = team_dict.get("team", {}).get("logo")
-            formation = team_dict.get("formation", "-")
-            starters = [p.get("player", {}).get("name") for p in (team_dict.get("startXI") or [])]
-            subs = [p.get("player", {}).get("name") for p in (team_dict.get("substitutes") or [])]
-
-            # Chip + formação badge
-            cc1, cc2 = st.columns([4, 1])
-            with cc1:
-                team_chip(tname, tlogo, size=28)
-            with cc2:
-                st.markdown(
-                    f"<div style='display:inline-block;padding:4px 8px;border-radius:8px;background:#1f2937;color:#fff;font-size:12px;'>formação: <b>{formation}</b></div>",
-                    unsafe_allow_html=True,
-                )
-            st.markdown("**Titulares:**")
-            grid_names(starters, cols=5)
-            if subs:
-                with st.expander("Ver banco de reservas"):
-                    grid_names(subs, cols=5)
-
-        # Render dos dois times (Evita quebras verticais)
-        left_l, right_l = st.columns(2)
-        with left_l:
-            render_team_lineup(by_id.get(home.get("id"), {}))
-        with right_l:
-            render_team_lineup(by_id.get(away.get("id"), {}))
-
-        # ----------------- Eventos (opcional, curto) ------------
-        # (mantemos simples para não pesar)
-        # events = api_client.fixture_events(fix.get("id")) or []
-        # if events:
-        #     st.subheader("Eventos")
-        #     tiny = [{"min": e.get("time", {}).get("elapsed"), 
-        #              "team": (e.get("team") or {}).get("name"),
-        #              "player": (e.get("player") or {}).get("name"),
-        #              "type": e.get("type"),
-        #              "detail": e.get("detail")} for e in events]
-        #     st.dataframe(pd.DataFrame(tiny), use_container_width=True, hide_index=True)
+    match_details(fix.get("id"), home, away)
 
 # ------------------------------------------------------------
 # Rodapé
 # ------------------------------------------------------------
-st.caption(f"Fonte: API-Football — /fixtures, /fixtures/statistics, /fixtures/lineups  (league={league['league_id']}, season={season}, team={team['team_id']})")
+st.caption(f"Fonte: API-Football — /fixtures (lista) e, ao abrir um jogo, /fixtures/statistics e /fixtures/lineups  (league={league['league_id']}, season={season}, team={team['team_id']})")
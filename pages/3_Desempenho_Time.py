@@ -1,11 +1,11 @@
 # pages/3_Desempenho_Time.py
-import math
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-from core import api_client, ui_utils
-from core.cache import render_cache_controls
+from core import api_client, match_facts, ui_utils
+from core.models import poisson, strength
+from core.cache import render_cache_controls, render_data_age
 
 render_cache_controls()  # mostra: última atualização + botões
 st.title("📊 Desempenho do Time — Série B")
@@ -22,6 +22,8 @@ season = st.sidebar.selectbox("Temporada", [2025, 2024, 2023], index=0)
 team   = api_client.team_by_id(CORITIBA_ID)
 league = api_client.league_by_id(SERIE_B_ID)
 
+ui_utils.prefetch_images([team.get("team_logo"), league.get("league_logo")], size=56)
+
 h1, h2, h3 = st.columns([1, 4, 1])
 with h1:
     ui_utils.load_image(team.get("team_logo"), size=56, alt="Logo do Coritiba")
@@ -36,7 +38,6 @@ st.caption(
 )
 
 OUR_ID = CORITIBA_ID
-FINALS = {"FT", "AET", "PEN"}
 
 # --------------------------- helpers --------------------------------
 def safe_pct(v):
@@ -53,28 +54,6 @@ def safe_pct(v):
     except Exception:
         return None
 
-def stat_value(items, aliases):
-    """
-    Busca um valor nas estatísticas de um fixture (lista de dicts),
-    aceitando vários aliases, de forma case-insensitive.
-    """
-    if not items:
-        return None
-    aliases_l = [a.lower() for a in aliases]
-    for it in items:
-        t = (it.get("type") or "").strip().lower()
-        if t in aliases_l:
-            return safe_pct(it.get("value"))
-    # Também tenta por 'startswith' (algumas ligas trocam sufixos)
-    for it in items:
-        t = (it.get("type") or "").strip().lower()
-        if any(t.startswith(a) for a in aliases_l):
-            return safe_pct(it.get("value"))
-    return None
-
-def is_final(fx):
-    return ((fx.get("fixture") or {}).get("status") or {}).get("short") in FINALS
-
 def fmt_metric(v, unit=""):
     if v is None or (isinstance(v, float) and np.isnan(v)):
         return "—"
@@ -84,76 +63,26 @@ def fmt_metric(v, unit=""):
 
 def avg(values):
     vals = [safe_pct(x) for x in values if x is not None]
+    vals = [v for v in vals if v is not None and not np.isnan(v)]  # NaN = stat ausente no jogo
     return round(float(np.mean(vals)), 2) if vals else None
 
 # --------------------------- coleta por jogo -------------------------
-fixtures_all = api_client.fixtures(OUR_ID, season) or []
-for m in fixtures_all:
-    try:
-        m["_date"] = pd.to_datetime((m.get("fixture") or {}).get("date"), errors="coerce")
-    except Exception:
-        m["_date"] = pd.NaT
-fixtures_all = sorted(fixtures_all, key=lambda x: x.get("_date") or pd.Timestamp(0))
-fixtures = [f for f in fixtures_all if is_final(f)]
-
-rows = []
-if fixtures:
-    progress = st.progress(0)
-else:
-    progress = None
-
-for i, fx in enumerate(fixtures, start=1):
-    if progress:
-        progress.progress(i / max(1, len(fixtures)))
-
-    f = fx.get("fixture") or {}
-    t = fx.get("teams") or {}
-    h, a = t.get("home") or {}, t.get("away") or {}
-    our_home = (h.get("id") == OUR_ID)
-
-    goals = fx.get("goals") or {}
-    gf = goals.get("home") if our_home else goals.get("away")
-    ga = goals.get("away") if our_home else goals.get("home")
-
-    # Estatísticas do jogo
-    try:
-        blocks = api_client.fixture_statistics(f.get("id")) or []
-    except Exception:
-        blocks = []
-
-    my_items, opp_items = [], []
-    for b in (blocks or []):
-        tid = (b.get("team") or {}).get("id")
-        if tid == OUR_ID:
-            my_items = b.get("statistics") or []
-        else:
-            opp_items = b.get("statistics") or []
-
-    # Aliases robustos
-    shots = stat_value(my_items, ["total shots", "shots total", "shots"])
-    sot   = stat_value(my_items, ["shots on goal", "shots on target", "sot"])
-    poss  = stat_value(my_items, ["ball possession", "possession", "ball possession %"])
-    # alguns payloads trazem contagem de passes certos, outros %
-    pass_acc = stat_value(my_items, ["passes %", "passes accurate", "accurate passes", "accurate passes %"])
-    corners_for     = stat_value(my_items, ["corner kicks", "corners"])
-    corners_against = stat_value(opp_items, ["corner kicks", "corners"])
-
-    rows.append({
-        "date": pd.to_datetime(f.get("date"), errors="coerce"),
-        "H/A": "H" if our_home else "A",
-        "GF": gf, "GA": ga,
-        "Shots": shots,
-        "SOT": sot,
-        "Poss%": poss,
-        "Pass%": pass_acc,      # tratamos como % se vier em %, número se vier contagem
-        "Corners_for": corners_for,
-        "Corners_against": corners_against,
-    })
-
-if progress:
-    progress.empty()
-
-df = pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
+# tabela de fatos compartilhada (core/match_facts.py): 1 linha por jogo finalizado
+progress = st.progress(0)
+facts = match_facts.season_match_facts(
+    OUR_ID, season, on_progress=lambda done, total: progress.progress(done / total)
+)
+progress.empty()
+
+df = facts.rename(columns={
+    "shots_for": "Shots",
+    "sot_for": "SOT",
+    "poss_for": "Poss%",
+    "pass_pct_for": "Pass%",
+    "corners_for": "Corners_for",
+    "corners_against": "Corners_against",
+})[["date", "H/A", "GF", "GA", "Shots", "SOT", "Poss%", "Pass%", "Corners_for", "Corners_against"]]
+render_data_age()  # idade do cache quando servido expirado (atualiza em 2º plano)
 
 # --------------------------- KPIs + gols por minuto ------------------
 stats = api_client.team_statistics(SERIE_B_ID, season, OUR_ID) or {}
@@ -230,9 +159,9 @@ st.markdown("---")
 st.markdown("### 📉 Tendências (médias móveis)")
 st.caption("**O que é**: evolução das métricas ao longo do tempo. A linha tracejada usa média móvel para suavizar oscilações.")
 
-if df.empty:
-    st.info("Sem jogos finalizados nesta temporada.")
-else:
+@st.fragment
+def trends_chart(df: pd.DataFrame):
+    """Só este bloco reexecuta ao mover o slider (df já está pronto)."""
     win_max = max(3, min(10, len(df)))
     win = st.slider("Janela (jogos)", 3, win_max, min(5, win_max))
     for col, label in [("GF", "Gols Pró"), ("GA", "Gols Contra"), ("SOT", "Chutes no alvo")]:
@@ -247,6 +176,11 @@ else:
         fig.update_layout(xaxis_title="Data", yaxis_title=label)
         st.plotly_chart(fig, use_container_width=True)
 
+if df.empty:
+    st.info("Sem jogos finalizados nesta temporada.")
+else:
+    trends_chart(df)
+
 st.markdown("---")
 
 # --------------------------- Casa x Fora ------------------------------
@@ -302,8 +236,9 @@ st.markdown("---")
 # --------------------------- Previsão (Poisson) ----------------------
 st.markdown("### 🔮 Previsão (Poisson) — Próximo jogo")
 st.caption(
-    "**Como funciona**: usa uma aproximação de Poisson com as médias de gols pró/contra do Coxa e do adversário "
-    "para estimar probabilidades de placares e V/E/D. É um modelo simples, apenas indicativo."
+    "**Como funciona**: ajusta forças de ataque/defesa de cada time (e o mando de campo) com todos os jogos "
+    "finalizados da Série B e usa a Poisson resultante para estimar placares e V/E/D. Sem dados suficientes, "
+    "cai para as médias de gols pró/contra do Coxa e do adversário. Apenas indicativo."
 )
 
 next_fx = api_client.fixtures(OUR_ID, season, next=1)
@@ -326,55 +261,50 @@ else:
         except Exception:
             pass
 
-    # λ Coxa a partir das médias desta página (fallbacks seguros)
-    lam_for     = gf_pg if gf_pg is not None else 1.0
-    lam_against = ga_pg if ga_pg is not None else 1.0
+    # λ do modelo de forças da liga (ataque/defesa/mando ajustados com todos os jogos da Série B)
+    model = strength.league_strengths(SERIE_B_ID, season)
+    lams = strength.expected_goals(model, home.get("id"), away.get("id"))
+    if lams is not None:
+        lam_us, lam_them = (lams[0], lams[1]) if is_home else (lams[1], lams[0])
+    else:
+        # fallback: médias desta página + médias do adversário em /teams/statistics
+        lam_for     = gf_pg if gf_pg is not None else 1.0
+        lam_against = ga_pg if ga_pg is not None else 1.0
 
-    # λ adversário (se disponível)
-    opp_stats = api_client.team_statistics(SERIE_B_ID, season, opp.get("id")) or {}
-    if isinstance(opp_stats, list):
-        opp_stats = opp_stats[0] if opp_stats else {}
+        opp_stats = api_client.team_statistics(SERIE_B_ID, season, opp.get("id")) or {}
+        if isinstance(opp_stats, list):
+            opp_stats = opp_stats[0] if opp_stats else {}
 
-    def read_avg_goals(block, side):
-        try:
-            g = (block.get("goals") or {}).get(side) or {}
-            val = (g.get("average") or {}).get("total")
-            return float(val) if val is not None else None
-        except Exception:
-            return None
+        def read_avg_goals(block, side):
+            try:
+                g = (block.get("goals") or {}).get(side) or {}
+                val = (g.get("average") or {}).get("total")
+                return float(val) if val is not None else None
+            except Exception:
+                return None
 
-    opp_for     = read_avg_goals(opp_stats, "for")
-    opp_against = read_avg_goals(opp_stats, "against")
+        opp_for     = read_avg_goals(opp_stats, "for")
+        opp_against = read_avg_goals(opp_stats, "against")
 
-    lam_us   = np.mean([x for x in [lam_for,     opp_against] if x is not None]) if any([lam_for, opp_against]) else 1.0
-    lam_them = np.mean([x for x in [lam_against, opp_for]     if x is not None]) if any([lam_against, opp_for]) else 1.0
+        lam_us   = np.mean([x for x in [lam_for,     opp_against] if x is not None]) if any([lam_for, opp_against]) else 1.0
+        lam_them = np.mean([x for x in [lam_against, opp_for]     if x is not None]) if any([lam_against, opp_for]) else 1.0
 
     lam_us   = float(lam_us)   if lam_us   and lam_us   > 0 else 1.0
     lam_them = float(lam_them) if lam_them and lam_them > 0 else 1.0
 
-    def pois_pmf(k, lam):
-        return math.exp(-lam) * (lam ** k) / math.factorial(k)
-
-    max_goals = 5
-    grid = np.zeros((max_goals + 1, max_goals + 1))
-    for i in range(max_goals + 1):
-        for j in range(max_goals + 1):
-            grid[i, j] = pois_pmf(i, lam_us) * pois_pmf(j, lam_them)
-    grid = grid / grid.sum()
+    # grade de placares vetorizada (core/models/poisson.py), na ordem real mandante × visitante
+    lam_home, lam_away = (lam_us, lam_them) if is_home else (lam_them, lam_us)
+    pred = poisson.predict(lam_home, lam_away)[0]
 
-    if is_home:
-        p_win  = float(np.triu(grid, 1).sum())   # nós > eles
-        p_lose = float(np.tril(grid, -1).sum())
-    else:
-        p_win  = float(np.tril(grid, -1).sum())  # invertido p/ visitante
-        p_lose = float(np.triu(grid, 1).sum())
-    p_draw   = float(np.trace(grid))
+    p_win  = pred["p_home"] if is_home else pred["p_away"]
+    p_lose = pred["p_away"] if is_home else pred["p_home"]
+    p_draw = pred["p_draw"]
 
-    p_over25 = float(sum(grid[i, j] for i in range(max_goals+1) for j in range(max_goals+1) if i + j >= 3))
-    p_btts   = float(sum(grid[i, j] for i in range(1, max_goals+1) for j in range(1, max_goals+1)))
+    p_over25 = pred["over"][2.5]
+    p_btts   = pred["btts"]
 
-    out = [(i, j, grid[i, j]) for i in range(max_goals + 1) for j in range(max_goals + 1)]
-    out = sorted(out, key=lambda x: x[2], reverse=True)[:6]
+    # placares sempre no formato Coxa–adversário
+    out = [(i, j, p) if is_home else (j, i, p) for i, j, p in pred["top_scores"]]
 
     cols = st.columns(3)
     cols[0].metric("Vitória", f"{round(p_win*100,1)}%")
@@ -384,10 +314,10 @@ else:
     cols = st.columns(3)
     cols[0].metric("Over 2.5 gols",        f"{round(p_over25*100,1)}%")
     cols[1].metric("BTTS (ambos marcam)",  f"{round(p_btts*100,1)}%")
-    cols[2].metric("xG simples (λ Coxa)",   round(lam_us, 2))
+    cols[2].metric("λ gols (Coxa)",        round(lam_us, 2))
 
     st.markdown("**Placares mais prováveis**")
     df_scores = pd.DataFrame([{"Placar": f"{i}–{j}", "Prob%": round(p*100, 2)} for i, j, p in out])
     st.dataframe(df_scores, use_container_width=True, hide_index=True)
 
-st.caption("Modelo de Poisson simples (independência e médias recentes). Use como referência, não como predição determinística.")
+st.caption("Modelo de Poisson (forças de ataque/defesa da liga; independência entre os gols). Use como referência, não como predição determinística.")
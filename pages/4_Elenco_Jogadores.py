@@ -18,6 +18,8 @@ season = st.sidebar.selectbox("Temporada", [2025, 2024, 2023], index=0)
 team   = api_client.team_by_id(CORITIBA_ID)
 league = api_client.league_by_id(SERIE_B_ID)
 
+ui_utils.prefetch_images([team.get("team_logo"), league.get("league_logo")], size=56)
+
 h1, h2, h3 = st.columns([1, 4, 1])
 with h1:
     ui_utils.load_image(team.get("team_logo"), size=56, alt="Logo do Coritiba")
@@ -47,68 +49,63 @@ def pick_professional_stats(stats_list):
     return None
 
 # ---------------------------
-# Coleta todas as páginas do /players
+# Coleta todas as páginas do /players (página 1 + demais em paralelo)
 # ---------------------------
-rows, page, max_pages = [], 1, 30
+rows = []
 with st.spinner("Carregando jogadores…"):
-    while page <= max_pages:
-        chunk = api_client.players_page(CORITIBA_ID, season, page) or []
-        if not chunk:
-            break
-        for item in chunk:
-            player = item.get("player", {}) or {}
-            s = pick_professional_stats(item.get("statistics") or [])
-            if not s:
-                continue  # ignora quem não atuou na Série B pelo Coritiba
-
-            games  = s.get("games",  {}) or {}
-            goals  = s.get("goals",  {}) or {}
-            shots  = s.get("shots",  {}) or {}
-            passes = s.get("passes", {}) or {}
-            duels  = s.get("duels",  {}) or {}
-            cards  = s.get("cards",  {}) or {}
-
-            minutes  = games.get("minutes") or 0
-            played   = games.get("appearences") or 0
-            position = games.get("position") or "-"
-            rating   = games.get("rating")
-            try:
-                rating = float(rating) if rating else None
-            except Exception:
-                rating = None
-
-            g_total     = goals.get("total")   or 0
-            a_total     = goals.get("assists") or 0
-            sot         = shots.get("on")      or 0
-            shots_total = shots.get("total")   or 0
-            key_passes  = passes.get("key")    or 0
-            duels_won   = duels.get("won")     or 0
-            duels_total = duels.get("total")   or 0
-            yc          = cards.get("yellow")  or 0
-            rc          = cards.get("red")     or 0
-
-            per90 = (minutes / 90) if minutes else 0
-            rows.append({
-                "foto":   player.get("photo"),
-                "nome":   player.get("name"),
-                "idade":  player.get("age"),
-                "pos":    position,
-                "min":    minutes,
-                "jogos":  played,
-                "gols":   g_total,
-                "assist": a_total,
-                "g90":    round(g_total   / per90, 2) if per90 else 0,
-                "a90":    round(a_total   / per90, 2) if per90 else 0,
-                "sot":    sot,
-                "sot90":  round(sot       / per90, 2) if per90 else 0,
-                "keyP":   key_passes,
-                "kp90":   round(key_passes/ per90, 2) if per90 else 0,
-                "duels%": round((duels_won / duels_total * 100), 1) if duels_total else None,
-                "YC":     yc,
-                "RC":     rc,
-                "rating": rating,
-            })
-        page += 1
+    for item in api_client.players_all(CORITIBA_ID, season):
+        player = item.get("player", {}) or {}
+        s = pick_professional_stats(item.get("statistics") or [])
+        if not s:
+            continue  # ignora quem não atuou na Série B pelo Coritiba
+
+        games  = s.get("games",  {}) or {}
+        goals  = s.get("goals",  {}) or {}
+        shots  = s.get("shots",  {}) or {}
+        passes = s.get("passes", {}) or {}
+        duels  = s.get("duels",  {}) or {}
+        cards  = s.get("cards",  {}) or {}
+
+        minutes  = games.get("minutes") or 0
+        played   = games.get("appearences") or 0
+        position = games.get("position") or "-"
+        rating   = games.get("rating")
+        try:
+            rating = float(rating) if rating else None
+        except Exception:
+            rating = None
+
+        g_total     = goals.get("total")   or 0
+        a_total     = goals.get("assists") or 0
+        sot         = shots.get("on")      or 0
+        shots_total = shots.get("total")   or 0
+        key_passes  = passes.get("key")    or 0
+        duels_won   = duels.get("won")     or 0
+        duels_total = duels.get("total")   or 0
+        yc          = cards.get("yellow")  or 0
+        rc          = cards.get("red")     or 0
+
+        per90 = (minutes / 90) if minutes else 0
+        rows.append({
+            "foto":   player.get("photo"),
+            "nome":   player.get("name"),
+            "idade":  player.get("age"),
+            "pos":    position,
+            "min":    minutes,
+            "jogos":  played,
+            "gols":   g_total,
+            "assist": a_total,
+            "g90":    round(g_total   / per90, 2) if per90 else 0,
+            "a90":    round(a_total   / per90, 2) if per90 else 0,
+            "sot":    sot,
+            "sot90":  round(sot       / per90, 2) if per90 else 0,
+            "keyP":   key_passes,
+            "kp90":   round(key_passes/ per90, 2) if per90 else 0,
+            "duels%": round((duels_won / duels_total * 100), 1) if duels_total else None,
+            "YC":     yc,
+            "RC":     rc,
+            "rating": rating,
+        })
 
 df = pd.DataFrame(rows)
 if df.empty:
@@ -134,38 +131,67 @@ ordem_sel = st.selectbox("Ordenar por", list(ordens.keys()), index=0)
 asc = st.toggle("Ordem crescente?", value=False)
 df_view = df_view.sort_values(ordens[ordem_sel], ascending=asc, na_position="last")
 
+modo = st.radio("Visualização", ["Cards", "Tabela compacta"], horizontal=True)
+
 st.divider()
 
-# render cards de jogadores (todos de uma vez)
-for _, r in df_view.iterrows():
-    card = st.container()
-    cimg, cmain, cnums = card.columns([1, 3, 3])
-
-    with cimg:
-        ui_utils.load_image(r["foto"], size=64, alt=r["nome"] or "Jogador")
-
-    with cmain:
-        st.markdown(f"**{r['nome'] or '—'}**")
-        st.caption(f"{r['pos'] or '-'} • {int(r['idade']) if pd.notna(r['idade']) else '-'} anos")
-        if r["rating"]:
-            st.write(f"⭐ Rating: **{r['rating']}**")
-
-    with cnums:
-        m1, m2, m3 = st.columns(3)
-        m1.metric("Min", int(r["min"]))
-        m2.metric("Gols", int(r["gols"]))
-        m3.metric("Assist.", int(r["assist"]))
-
-        m4, m5, m6 = st.columns(3)
-        m4.metric("G/90",  r["g90"])
-        m5.metric("A/90",  r["a90"])
-        m6.metric("SOT/90", r["sot90"])
-
-        m7, m8, m9 = st.columns(3)
-        m7.metric("KeyP/90", r["kp90"])
-        m8.metric("Duelos %", r["duels%"] if pd.notna(r["duels%"]) else 0)
-        m9.metric("Cartões", f"{int(r['YC'])}🟨 / {int(r['RC'])}🟥")
-
-    st.markdown("---")
+if modo == "Tabela compacta":
+    # uma tabela só (sem fotos nem métricas por jogador): barata mesmo com elencos grandes
+    st.dataframe(
+        df_view[["nome", "pos", "idade", "min", "gols", "assist", "g90", "a90", "sot90", "kp90",
+                 "duels%", "YC", "RC", "rating"]],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "nome": "Jogador", "pos": "Posição", "idade": "Idade", "min": "Min",
+            "gols": "Gols", "assist": "Assist.", "g90": "G/90", "a90": "A/90",
+            "sot90": "SOT/90", "kp90": "KeyP/90", "duels%": "Duelos %",
+            "YC": "🟨", "RC": "🟥", "rating": "Rating",
+        },
+    )
+else:
+    # cards paginados: só a página visível monta widgets e busca fotos
+    pc1, pc2 = st.columns([1, 1])
+    with pc1:
+        page_size = st.selectbox("Jogadores por página", [6, 12, 24], index=1)
+    n_pages = max(1, -(-len(df_view) // page_size))
+    with pc2:
+        page = st.number_input("Página", min_value=1, max_value=n_pages, value=1, step=1)
+    page_df = df_view.iloc[(page - 1) * page_size: page * page_size]
+    st.caption(f"Página {page} de {n_pages} • {len(df_view)} atletas")
+
+    # fotos da página baixadas em paralelo antes de montar os cards (cache em memória/disco)
+    ui_utils.prefetch_images(page_df["foto"].tolist(), size=64)
+
+    for _, r in page_df.iterrows():
+        card = st.container()
+        cimg, cmain, cnums = card.columns([1, 3, 3])
+
+        with cimg:
+            ui_utils.load_image(r["foto"], size=64, alt=r["nome"] or "Jogador")
+
+        with cmain:
+            st.markdown(f"**{r['nome'] or '—'}**")
+            st.caption(f"{r['pos'] or '-'} • {int(r['idade']) if pd.notna(r['idade']) else '-'} anos")
+            if r["rating"]:
+                st.write(f"⭐ Rating: **{r['rating']}**")
+
+        with cnums:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Min", int(r["min"]))
+            m2.metric("Gols", int(r["gols"]))
+            m3.metric("Assist.", int(r["assist"]))
+
+            m4, m5, m6 = st.columns(3)
+            m4.metric("G/90",  r["g90"])
+            m5.metric("A/90",  r["a90"])
+            m6.metric("SOT/90", r["sot90"])
+
+            m7, m8, m9 = st.columns(3)
+            m7.metric("KeyP/90", r["kp90"])
+            m8.metric("Duelos %", r["duels%"] if pd.notna(r["duels%"]) else 0)
+            m9.metric("Cartões", f"{int(r['YC'])}🟨 / {int(r['RC'])}🟥")
+
+        st.markdown("---")
 
 st.caption("Fonte: API-Football — /players (todas as páginas), filtrado por liga=72, time=147 e minutos > 0.")
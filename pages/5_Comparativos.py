@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from core import api_client, ui_utils
+import plotly.express as px
+from core import api_client, standings_history, ui_utils
+from core.models import season_sim
 from core.cache import render_cache_controls
 render_cache_controls()  # mostra: última atualização + botões
 
@@ -83,16 +85,120 @@ st.dataframe(
 st.markdown("---")
 
 # Comparativo rápido Coxa vs. um rival escolhido
-times = df["Time"].tolist()
-rival = st.selectbox("Comparar com rival", [t for t in times if t.lower() != "coritiba"])
-coxa_row = df[df["Time"].str.lower() == "coritiba"].iloc[0]
-rival_row = df[df["Time"] == rival].iloc[0]
-
-c1, c2, c3, c4, c5 = st.columns(5)
-c1.metric("Pts (Coxa)", int(coxa_row["Pts"]), delta=int(coxa_row["Pts"] - int(rival_row["Pts"])))
-c2.metric("SG (Coxa)", int(coxa_row["SG"]), delta=int(coxa_row["SG"] - int(rival_row["SG"])))
-c3.metric("Vitórias (Coxa)", int(coxa_row["V"]), delta=int(coxa_row["V"] - int(rival_row["V"])))
-c4.metric("GP (Coxa)", int(coxa_row["GP"]), delta=int(coxa_row["GP"] - int(rival_row["GP"])))
-c5.metric("GC (Coxa)", int(coxa_row["GC"]), delta=int(coxa_row["GC"] - int(rival_row["GC"])))
-
-st.caption("Fonte: API-Football — standings da Série B.")
+@st.fragment
+def rival_compare(df: pd.DataFrame):
+    """Trocar o rival reexecuta só estas métricas (tabela já montada)."""
+    times = df["Time"].tolist()
+    rival = st.selectbox("Comparar com rival", [t for t in times if t.lower() != "coritiba"])
+    coxa_row = df[df["Time"].str.lower() == "coritiba"].iloc[0]
+    rival_row = df[df["Time"] == rival].iloc[0]
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Pts (Coxa)", int(coxa_row["Pts"]), delta=int(coxa_row["Pts"] - int(rival_row["Pts"])))
+    c2.metric("SG (Coxa)", int(coxa_row["SG"]), delta=int(coxa_row["SG"] - int(rival_row["SG"])))
+    c3.metric("Vitórias (Coxa)", int(coxa_row["V"]), delta=int(coxa_row["V"] - int(rival_row["V"])))
+    c4.metric("GP (Coxa)", int(coxa_row["GP"]), delta=int(coxa_row["GP"] - int(rival_row["GP"])))
+    c5.metric("GC (Coxa)", int(coxa_row["GC"]), delta=int(coxa_row["GC"] - int(rival_row["GC"])))
+
+rival_compare(df)
+
+st.markdown("---")
+
+# Posição rodada a rodada (reconstruída dos jogos da liga)
+st.markdown("### 📈 Posição rodada a rodada")
+st.caption("**O que é**: classificação após cada rodada, recalculada a partir dos resultados dos jogos da liga.")
+
+@st.fragment
+def position_chart(hist: pd.DataFrame, df: pd.DataFrame):
+    """Escolher rivais redesenha só o gráfico (histórico já reconstruído)."""
+    coxa_name = next((t for t in df["Time"] if t.lower() == "coritiba"), "Coritiba")
+    # padrão: vizinhos do Coxa na tabela atual
+    pos = df.index[df["Time"] == coxa_name]
+    near = df["Time"].iloc[max(0, pos[0] - 1): pos[0] + 2].tolist() if len(pos) else []
+    rivals = st.multiselect(
+        "Rivais no gráfico",
+        sorted(t for t in hist["team"].dropna().unique() if t != coxa_name),
+        default=[t for t in near if t != coxa_name and t in set(hist["team"])],
+    )
+    plot = hist[hist["team"].isin([coxa_name] + rivals)]
+    fig = px.line(plot, x="round", y="rank", color="team", markers=True,
+                  hover_data={"pts": True, "gd": True})
+    fig.update_yaxes(autorange="reversed", dtick=1, title="Posição")
+    fig.update_layout(xaxis_title="Rodada", legend_title="Time")
+    # faixas de acesso (4 primeiros) e rebaixamento (4 últimos)
+    n_teams = hist["team_id"].nunique()
+    fig.add_hrect(y0=0.5, y1=4.5, fillcolor="green", opacity=0.08, line_width=0)
+    fig.add_hrect(y0=n_teams - 3.5, y1=n_teams + 0.5, fillcolor="red", opacity=0.08, line_width=0)
+    st.plotly_chart(fig, use_container_width=True)
+
+hist = standings_history.standings_history(league["league_id"], season)
+if hist.empty:
+    st.info("Sem jogos finalizados para reconstruir a evolução da tabela.")
+else:
+    position_chart(hist, df)
+
+st.markdown("---")
+
+# Projeção da tabela final (Monte Carlo)
+st.markdown("### 🎲 Projeção da tabela final")
+st.caption(
+    "**Como funciona**: os jogos restantes são simulados 100 mil vezes com as forças de ataque/defesa "
+    "de cada time (Poisson). Desempate: pontos, vitórias e saldo de gols."
+)
+
+@st.fragment
+def projection(sim, remaining, coxa_id: int):
+    """Travar resultados reprojeta só este bloco (simulação já sorteada)."""
+    # "e se…?": travar resultados dos próximos jogos do Coxa
+    coxa_games = [(i, r) for i, r in enumerate(remaining) if coxa_id in (r["home_id"], r["away_id"])]
+
+    def _game_label(r):
+        home_game = r["home_id"] == coxa_id
+        opp_name = r["away"] if home_game else r["home"]
+        return f"{r.get('round') or ''} • {opp_name} ({'Casa' if home_game else 'Fora'})"
+
+    labels = {_game_label(r): (i, r) for i, r in coxa_games}
+    chosen = st.multiselect("E se…? Travar resultados do Coxa", list(labels))
+    locks = {}
+    for label in chosen:
+        i, r = labels[label]
+        res = st.radio(label, ["Vitória", "Empate", "Derrota"], horizontal=True, key=f"lock_{i}")
+        home_game = r["home_id"] == coxa_id
+        us, them = {"Vitória": (1, 0), "Empate": (1, 1), "Derrota": (0, 1)}[res]
+        locks[i] = (us, them) if home_game else (them, us)
+
+    proj = sim.project(locks)
+    proj_df = pd.DataFrame({
+        "Time": [t["name"] for t in proj["teams"]],
+        "Pts esperados": proj["exp_points"].round(1),
+        "Pos. média": proj["exp_position"].round(1),
+        "Título %": (proj["p_title"] * 100).round(1),
+        "Acesso %": (proj["p_promotion"] * 100).round(1),
+        "Rebaixamento %": (proj["p_relegation"] * 100).round(1),
+    }).sort_values("Pos. média").reset_index(drop=True)
+
+    st.dataframe(
+        proj_df.style.apply(highlight_coxa, axis=1),
+        use_container_width=True,
+        hide_index=True,
+    )
+    if locks:
+        base = sim.project()
+        k = next((n for n, t in enumerate(base["teams"]) if t["id"] == coxa_id), None)
+        if k is not None:
+            c1, c2 = st.columns(2)
+            c1.metric("Acesso (Coxa)", f"{proj['p_promotion'][k]*100:.1f}%",
+                      delta=f"{(proj['p_promotion'][k] - base['p_promotion'][k])*100:+.1f} p.p.")
+            c2.metric("Rebaixamento (Coxa)", f"{proj['p_relegation'][k]*100:.1f}%",
+                      delta=f"{(proj['p_relegation'][k] - base['p_relegation'][k])*100:+.1f} p.p.",
+                      delta_color="inverse")
+
+with st.spinner("Simulando o restante da temporada…"):
+    sim, remaining = season_sim.league_sim(league["league_id"], season)
+
+if not remaining:
+    st.info("Não há jogos restantes na temporada para simular.")
+else:
+    projection(sim, remaining, team["team_id"])
+
+st.caption("Fonte: API-Football — standings e jogos da Série B.")
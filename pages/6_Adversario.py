@@ -1,12 +1,12 @@
 # pages/6_Adversario.py
-import math
 import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-from core import api_client, ui_utils, ai
+from core import api_client, match_facts, ui_utils, ai
 from core.cache import render_cache_controls, get_json
+from core.models import poisson, strength
 
 render_cache_controls()
 
@@ -23,6 +23,8 @@ season = st.sidebar.selectbox("Temporada", [2025, 2024, 2023], index=0)
 team   = api_client.team_by_id(CORITIBA_ID)
 league = api_client.league_by_id(SERIE_B_ID)
 
+ui_utils.prefetch_images([team.get("team_logo"), league.get("league_logo")], size=56)
+
 h1, h2, h3 = st.columns([1, 4, 1])
 with h1:
     ui_utils.load_image(team.get("team_logo"), size=56, alt="Logo do Coritiba")
@@ -140,39 +142,13 @@ if isinstance(opp_stats, list):
     opp_stats = opp_stats[0] if opp_stats else {}
 
 take_n = min(10, len(opp_finals))
-shots, sots, poss, pass_acc, corners_for, corners_against = [], [], [], [], [], []
-for it in opp_finals[:take_n]:
-    try:
-        blocks = api_client.fixture_statistics((it.get("fixture") or {}).get("id")) or []
-    except Exception:
-        blocks = []
-    my_items, opp_items = [], []
-    for b in blocks:
-        tid = (b.get("team") or {}).get("id")
-        if tid == opp_id:
-            my_items = b.get("statistics") or []
-        else:
-            opp_items = b.get("statistics") or []
-
-    def pick(items, aliases):
-        aliases_l = [a.lower() for a in aliases]
-        for x in (items or []):
-            t = (x.get("type") or "").lower()
-            if t in aliases_l:
-                return x.get("value")
-        for x in (items or []):
-            t = (x.get("type") or "").lower()
-            if any(t.startswith(a) for a in aliases_l):
-                return x.get("value")
-        return None
-
-    shots.append(_safe_pct(pick(my_items, ["total shots", "shots total", "shots"])))
-    sots.append(_safe_pct(pick(my_items, ["shots on goal", "shots on target", "sot"])))
-    poss.append(_safe_pct(pick(my_items, ["ball possession", "possession"])))
-    # qualquer métrica de % de passe
-    pass_acc.append(_safe_pct(next((x.get("value") for x in (my_items or []) if "pass" in (x.get("type") or "").lower() and "%" in str(x.get("value"))), None)))
-    corners_for.append(_safe_pct(pick(my_items, ["corner kicks", "corners"])))
-    corners_against.append(_safe_pct(pick(opp_items, ["corner kicks", "corners"])))
+# tabela de fatos compartilhada (core/match_facts.py), na perspectiva do adversário
+opp_facts = match_facts.season_match_facts(opp_id, season, fixtures=opp_fixtures_all, last_n=take_n)
+sots            = opp_facts["sot_for"].dropna().tolist()
+poss            = opp_facts["poss_for"].dropna().tolist()
+pass_acc        = opp_facts["pass_pct_for"].dropna().tolist()
+corners_for     = opp_facts["corners_for"].dropna().tolist()
+corners_against = opp_facts["corners_against"].dropna().tolist()
 
 def goals_avg(block, side):
     try:
@@ -288,46 +264,51 @@ st.markdown("---")
 # 6) Probabilidades (Poisson) para o confronto
 # ---------------------------------------------------------------------
 st.markdown("### 🔮 Probabilidade de resultados (Poisson)")
-st.caption("**Como funciona**: aproximação de Poisson usando médias de gols do Coxa e do adversário.")
+st.caption("**Como funciona**: Poisson com forças de ataque/defesa e mando ajustados em todos os jogos da Série B "
+           "(sem dados suficientes, usa as médias de gols do Coxa e do adversário).")
 
 coxa_fixtures = api_client.fixtures(OUR_ID, season) or []
 for m in coxa_fixtures:
     m["_d"] = pd.to_datetime((m.get("fixture") or {}).get("date"), errors="coerce")
 coxa_finals = [m for m in coxa_fixtures if _is_final(m)]
-gf_list, ga_list = [], []
-for it in coxa_finals:
-    t = it.get("teams") or {}
-    h, a = t.get("home", {}), t.get("away", {})
-    our_home = (h.get("id") == OUR_ID)
-    gh = (it.get("goals") or {}).get("home")
-    ga = (it.get("goals") or {}).get("away")
-    gf_list.append(gh if our_home else ga)
-    ga_list.append(ga if our_home else gh)
-
-coxa_gf = _avg(gf_list) or 1.0
-coxa_ga = _avg(ga_list) or 1.0
-opp_gf  = ( ((opp_stats.get("goals") or {}).get("for") or {}).get("average") or {} ).get("total")
-opp_ga  = ( ((opp_stats.get("goals") or {}).get("against") or {}).get("average") or {} ).get("total")
-opp_gf  = float(opp_gf) if opp_gf is not None else 1.0
-opp_ga  = float(opp_ga) if opp_ga is not None else 1.0
-
-lam_us   = float(np.mean([coxa_gf, opp_ga]))
-lam_them = float(np.mean([coxa_ga, opp_gf]))
 
-def pois_pmf(k, lam):
-    return math.exp(-lam) * (lam ** k) / math.factorial(k)
-
-max_goals = 5
-grid = np.array([[pois_pmf(i, lam_us) * pois_pmf(j, lam_them)
-                  for j in range(max_goals+1)] for i in range(max_goals+1)], dtype=float)
-grid = grid / grid.sum()
-
-p_win  = float(np.triu(grid, 1).sum())
-p_lose = float(np.tril(grid, -1).sum())
-p_draw = float(np.trace(grid))
-
-p_over25 = float(sum(grid[i, j] for i in range(max_goals+1) for j in range(max_goals+1) if i + j >= 3))
-p_btts   = float(sum(grid[i, j] for i in range(1, max_goals+1) for j in range(1, max_goals+1)))
+# λ do modelo de forças da liga (ataque/defesa/mando ajustados com todos os jogos da Série B)
+model = strength.league_strengths(SERIE_B_ID, season)
+lams = strength.expected_goals(model, home.get("id"), away.get("id"))
+if lams is not None:
+    lam_us, lam_them = (lams[0], lams[1]) if is_home else (lams[1], lams[0])
+else:
+    # fallback: médias de gols do Coxa (temporada) + médias do adversário em /teams/statistics
+    gf_list, ga_list = [], []
+    for it in coxa_finals:
+        t = it.get("teams") or {}
+        h, a = t.get("home", {}), t.get("away", {})
+        our_home = (h.get("id") == OUR_ID)
+        gh = (it.get("goals") or {}).get("home")
+        ga = (it.get("goals") or {}).get("away")
+        gf_list.append(gh if our_home else ga)
+        ga_list.append(ga if our_home else gh)
+
+    coxa_gf = _avg(gf_list) or 1.0
+    coxa_ga = _avg(ga_list) or 1.0
+    opp_gf  = ( ((opp_stats.get("goals") or {}).get("for") or {}).get("average") or {} ).get("total")
+    opp_ga  = ( ((opp_stats.get("goals") or {}).get("against") or {}).get("average") or {} ).get("total")
+    opp_gf  = float(opp_gf) if opp_gf is not None else 1.0
+    opp_ga  = float(opp_ga) if opp_ga is not None else 1.0
+
+    lam_us   = float(np.mean([coxa_gf, opp_ga]))
+    lam_them = float(np.mean([coxa_ga, opp_gf]))
+
+# grade de placares vetorizada (core/models/poisson.py), na ordem real mandante × visitante
+lam_home, lam_away = (lam_us, lam_them) if is_home else (lam_them, lam_us)
+pred = poisson.predict(lam_home, lam_away)[0]
+
+p_win  = pred["p_home"] if is_home else pred["p_away"]
+p_lose = pred["p_away"] if is_home else pred["p_home"]
+p_draw = pred["p_draw"]
+
+p_over25 = pred["over"][2.5]
+p_btts   = pred["btts"]
 
 cols = st.columns(3)
 cols[0].metric("Vitória (Coxa)", f"{round(p_win*100,1)}%")
@@ -337,13 +318,10 @@ cols[2].metric("Derrota",        f"{round(p_lose*100,1)}%")
 cols = st.columns(3)
 cols[0].metric("Over 2.5",          f"{round(p_over25*100,1)}%")
 cols[1].metric("BTTS",              f"{round(p_btts*100,1)}%")
-cols[2].metric("xG simples (Coxa)", round(lam_us, 2))
+cols[2].metric("λ gols (Coxa)",     round(lam_us, 2))
 
-out = []
-for i in range(max_goals + 1):
-    for j in range(max_goals + 1):
-        out.append((i, j, float(grid[i, j])))
-top6 = sorted(out, key=lambda x: x[2], reverse=True)[:6]
+# placares sempre no formato Coxa–adversário
+top6 = [(i, j, p) if is_home else (j, i, p) for i, j, p in pred["top_scores"]]
 st.markdown("**Placares mais prováveis**")
 st.dataframe(pd.DataFrame([{"Placar": f"{i}–{j}", "Prob%": round(p*100, 2)} for i, j, p in top6]),
              use_container_width=True, hide_index=True)
@@ -415,7 +393,8 @@ btn = st.button("Gerar prévia IA")
 if btn:
     try:
         with st.spinner("Consultando a IA…"):
-            cards = ai.generate_insights(context) or []
+            # fallback em paralelo só se o 1º pedido passar da latência normal
+            cards = ai.generate_insights(context, hedge_after=ai.HEDGE_AFTER) or []
         if not cards:
             st.info("A IA não retornou insights para este contexto.")
         else:
@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-from core import api_client, ui_utils
-from core.cache import render_cache_controls
+from core import alerts, api_client, match_facts, rolling, ui_utils
+from core.cache import render_cache_controls, render_data_age
 render_cache_controls()  # mostra: última atualização + botões
 
 st.title("📈 Tendências & Alertas — Série B")
@@ -30,97 +29,38 @@ st.caption("Análise de tendências usando **somente partidas finalizadas**. As
 # ---------------------------------------------------------------------
 # 1) Coleta — só jogos FINALIZADOS
 # ---------------------------------------------------------------------
-ALL_FINALS = {"FT", "AET", "PEN"}  # finalizados
 OUR_ID = team["team_id"]
 
-def _is_final(fx) -> bool:
-    return (fx["fixture"].get("status", {}).get("short") or "") in ALL_FINALS
-
 fixtures = api_client.fixtures(OUR_ID, season) or []
 if not fixtures:
     st.info("Nenhuma partida retornada para esta temporada.")
     st.stop()
 
-for m in fixtures:
-    m["_date"] = pd.to_datetime(m["fixture"]["date"], errors="coerce")
-# ordena asc para calcular séries no tempo; filtra finais; pega últimos N
-finals = [f for f in sorted(fixtures, key=lambda x: x.get("_date") or pd.Timestamp(0)) if _is_final(f)]
-finals = finals[-last_n:]
+# tabela de fatos compartilhada (core/match_facts.py): finalizados, asc, últimos N
+progress = st.progress(0)
+facts = match_facts.season_match_facts(
+    OUR_ID, season, fixtures=fixtures, last_n=last_n,
+    on_progress=lambda done, total: progress.progress(done / total),
+)
+progress.empty()
 
-if not finals:
+if facts.empty:
     st.info("Não há partidas finalizadas suficientes para a janela selecionada.")
     st.stop()
 
-def _stat_value(items, keys):
-    """Busca valor numérico tentando várias chaves; normaliza %."""
-    for k in keys:
-        for it in items:
-            if (it.get("type") or "").lower() == k.lower():
-                v = it.get("value")
-                if v is None:
-                    return None
-                if isinstance(v, str) and "%" in v:
-                    try:
-                        return float(v.replace("%", "").strip())
-                    except Exception:
-                        return None
-                try:
-                    return float(v)
-                except Exception:
-                    try:
-                        return int(v)
-                    except Exception:
-                        return None
-    return None
-
-rows = []
-progress = st.progress(0)
-for i, fx in enumerate(finals, start=1):
-    progress.progress(i / len(finals))
-
-    f = fx["fixture"]
-    h, a = fx["teams"]["home"], fx["teams"]["away"]
-    our_home = (h["id"] == OUR_ID)
-
-    gf = fx["goals"]["home"] if our_home else fx["goals"]["away"]
-    ga = fx["goals"]["away"] if our_home else fx["goals"]["home"]
-
-    # estatísticas do jogo (podem faltar em alguns jogos)
-    try:
-        blocks = api_client.fixture_statistics(f["id"])
-    except Exception:
-        blocks = []
-
-    my_items, opp_items = [], []
-    for b in (blocks or []):
-        tid = (b.get("team") or {}).get("id")
-        if tid == OUR_ID:
-            my_items = b.get("statistics") or []
-        else:
-            opp_items = b.get("statistics") or []
-
-    shots_total = _stat_value(my_items, ["Total Shots", "Shots Total", "Shots"])
-    shots_on = _stat_value(my_items, ["Shots on Goal", "Shots on Target", "SOT"])
-    poss = _stat_value(my_items, ["Ball Possession", "Possession"])
-    corners_for = _stat_value(my_items, ["Corner Kicks", "Corners"])
-    corners_against = _stat_value(opp_items, ["Corner Kicks", "Corners"])
-    fouls_for = _stat_value(my_items, ["Fouls"])
-    fouls_against = _stat_value(opp_items, ["Fouls"])
-    yc_for = _stat_value(my_items, ["Yellow Cards"])
-    rc_for = _stat_value(my_items, ["Red Cards"])
-
-    rows.append({
-        "date": pd.to_datetime(f["date"], errors="coerce"),
-        "fixture_id": f["id"],
-        "GF": gf, "GA": ga,
-        "SOT": shots_on, "Shots": shots_total, "Poss%": poss,
-        "Corners_for": corners_for, "Corners_against": corners_against,
-        "Fouls_for": fouls_for, "Fouls_against": fouls_against,
-        "YC_for": yc_for, "RC_for": rc_for,
-    })
-
-progress.empty()
-df = pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
+df = facts.rename(columns={
+    "sot_for": "SOT",
+    "shots_for": "Shots",
+    "poss_for": "Poss%",
+    "corners_for": "Corners_for",
+    "corners_against": "Corners_against",
+    "fouls_for": "Fouls_for",
+    "fouls_against": "Fouls_against",
+    "yellow_for": "YC_for",
+    "red_for": "RC_for",
+})[["date", "fixture_id", "GF", "GA", "SOT", "Shots", "Poss%", "Corners_for", "Corners_against",
+    "Fouls_for", "Fouls_against", "YC_for", "RC_for"]]
+render_data_age()  # idade do cache quando servido expirado (atualiza em 2º plano)
 
 # ---------------------------------------------------------------------
 # 2) Tendências com janelas móveis (5 e 10) — ignorando buracos
@@ -138,83 +78,24 @@ METRICS = [
     ("RC_for", "Vermelhos (CFC) (média)"),
 ]
 
-def rolling_current(series: pd.Series, window: int):
-    """Média dos últimos 'window' valores válidos (ignora NaN)."""
-    s = pd.to_numeric(series, errors="coerce").dropna()
-    if s.empty:
-        return None
-    return float(s.tail(min(window, len(s))).mean())
-
-def rolling_series(series: pd.Series, window: int):
-    """Série de médias móveis usando somente valores válidos até cada ponto."""
-    out = []
-    history = []
-    for v in series:
-        history.append(v)
-        h = pd.Series(pd.to_numeric(history, errors="coerce")).dropna()
-        out.append(float(h.tail(min(window, len(h))).mean()) if not h.empty else np.nan)
-    return out
-
-season_means = {}
-for key, _ in METRICS:
-    season_means[key] = pd.to_numeric(df[key], errors="coerce").dropna().mean()
-
-for key, _ in METRICS:
-    df[f"{key}_roll5"] = rolling_series(df[key], 5)
-    df[f"{key}_roll10"] = rolling_series(df[key], 10)
-
-def classify_delta(delta_pct: float) -> str:
-    if delta_pct is None or np.isnan(delta_pct):
-        return "low"
-    absd = abs(delta_pct)
-    if absd >= 30: return "high"
-    if absd >= 15: return "medium"
-    return "low"
-
-def arrow(delta: float) -> str:
-    if delta is None or np.isnan(delta): return "↔"
-    return "▲" if delta > 0 else ("▼" if delta < 0 else "↔")
-
-def conf(n_games: int, window: int) -> float:
-    return round(min(n_games, window) / window, 2)
+# médias móveis ignorando buracos — todas as métricas × janelas numa passada (core/rolling.py)
+df = df.join(rolling.rolling_valid_means(df, [key for key, _ in METRICS], WINDOWS))
 
 st.divider()
 st.subheader("🔔 Tendências detectadas (janelas 5 e 10 jogos)")
 
-n_games = len(df)
-cards = []
-for col, label in METRICS:
-    current5 = rolling_current(df[col], 5)
-    current10 = rolling_current(df[col], 10)
-    base = season_means.get(col, np.nan)
-
-    d5 = ((current5 - base) / base * 100.0) if (pd.notna(base) and base != 0 and current5 is not None) else None
-    d10 = ((current10 - base) / base * 100.0) if (pd.notna(base) and base != 0 and current10 is not None) else None
-
-    cards.append({
-        "metric": label, "window": 5,
-        "value": None if current5 is None else round(current5, 2),
-        "delta_pct": None if d5 is None else round(d5, 1),
-        "severity": classify_delta(d5),
-        "confidence": conf(n_games, 5),
-        "arrow": arrow(d5),
-    })
-    cards.append({
-        "metric": label, "window": 10,
-        "value": None if current10 is None else round(current10, 2),
-        "delta_pct": None if d10 is None else round(d10, 1),
-        "severity": classify_delta(d10),
-        "confidence": conf(n_games, 10),
-        "arrow": arrow(d10),
-    })
+# todas as métricas × janelas pontuadas de uma vez (core/alerts.py)
+label_of = dict(METRICS)
+cards = alerts.score_trends(df, [key for key, _ in METRICS], WINDOWS)
 
-for c in cards:
+for c in cards.itertuples(index=False):
     with st.container(border=True):
-        vtxt = "—" if c["value"] is None else str(c["value"])
-        dtxt = "—" if c["delta_pct"] is None else f"{c['delta_pct']}%"
-        sev_emoji = {"high": "🟥", "medium": "🟨", "low": "🟩"}[c["severity"]]
-        st.markdown(f"**{c['metric']}** — janela **{c['window']}** jogos")
-        st.write(f"Valor atual: **{vtxt}**  •  Δ vs média: **{c['arrow']} {dtxt}**  •  Severidade: {sev_emoji} **{c['severity']}**  •  Confiança: **{c['confidence']}**")
+        vtxt = "—" if pd.isna(c.value) else str(round(c.value, 2))
+        dtxt = "—" if pd.isna(c.delta_pct) else f"{round(c.delta_pct, 1)}%"
+        ztxt = "—" if pd.isna(c.zscore) else f"{round(c.zscore, 2)}"
+        sev_emoji = {"high": "🟥", "medium": "🟨", "low": "🟩"}[c.severity]
+        st.markdown(f"**{label_of[c.metric]}** — janela **{c.window}** jogos")
+        st.write(f"Valor atual: **{vtxt}**  •  Δ vs média: **{c.arrow} {dtxt}**  •  z: **{ztxt}**  •  Severidade: {sev_emoji} **{c.severity}**  •  Confiança: **{c.confidence}**")
 
 st.divider()
 
@@ -224,35 +105,82 @@ st.divider()
 st.subheader("📉 Séries temporais com janelas móveis")
 
 label2col = {m[1]: m[0] for m in METRICS}
-plot_metric = st.selectbox("Escolha uma métrica para visualizar", list(label2col.keys()), index=0)
-col = label2col[plot_metric]
 
-# seleciona e renomeia colunas para nomes únicos
-df_plot = df[["date", col, f"{col}_roll5", f"{col}_roll10"]].copy()
-df_plot = df_plot.rename(columns={
-    col: "Observado",
-    f"{col}_roll5": "Média (5j)",
-    f"{col}_roll10": "Média (10j)",
-})
+@st.fragment
+def metric_chart(df: pd.DataFrame):
+    """Trocar a métrica reexecuta só o gráfico (df e médias móveis já estão prontos)."""
+    plot_metric = st.selectbox("Escolha uma métrica para visualizar", list(label2col.keys()), index=0)
+    col = label2col[plot_metric]
+
+    # seleciona e renomeia colunas para nomes únicos
+    df_plot = df[["date", col, f"{col}_roll5", f"{col}_roll10"]].copy()
+    df_plot = df_plot.rename(columns={
+        col: "Observado",
+        f"{col}_roll5": "Média (5j)",
+        f"{col}_roll10": "Média (10j)",
+    })
+
+    # usa só as séries que têm pelo menos 1 valor não-nulo
+    value_vars = [c for c in ["Observado", "Média (5j)", "Média (10j)"] if df_plot[c].notna().any()]
+
+    if not value_vars:
+        st.info("Não há dados suficientes dessa métrica para plotar.")
+    else:
+        df_melt = df_plot.melt(
+            id_vars="date",
+            value_vars=value_vars,
+            var_name="Série",
+            value_name="Valor"  # agora não conflita com nenhuma coluna existente
+        )
+        fig = px.line(df_melt, x="date", y="Valor", color="Série")
+        fig.update_layout(xaxis_title="Data", yaxis_title=plot_metric)
+        st.plotly_chart(fig, use_container_width=True)
+
+metric_chart(df)
 
-# usa só as séries que têm pelo menos 1 valor não-nulo
-value_vars = [c for c in ["Observado", "Média (5j)", "Média (10j)"] if df_plot[c].notna().any()]
+# ---------------------------------------------------------------------
+# 4) Quem está em alta na liga (todas as equipes de uma vez)
+# ---------------------------------------------------------------------
+st.divider()
+st.subheader("🏆 Quem está em alta na liga")
+st.caption("Mesmo motor de alertas aplicado a todos os clubes da competição (z = Δ vs média da temporada ÷ desvio-padrão da janela).")
+
+@st.fragment
+def league_ranking(league_df: pd.DataFrame):
+    """Ranking da liga para a métrica/janela escolhidas (reexecuta só este bloco)."""
+    names = league_df.drop_duplicates("team_id").set_index("team_id")["team"]
+    league_metric = st.selectbox("Métrica", list(label2col.keys()), index=0, key="league_metric")
+    league_window = st.radio("Janela", WINDOWS, horizontal=True, key="league_window")
+    scores = alerts.score_trends(league_df, [label2col[league_metric]], [league_window], by="team_id")
+    scores["Time"] = scores["team_id"].map(names)
+    scores = scores.sort_values("zscore", ascending=False, na_position="last")
+    st.dataframe(
+        scores[["Time", "value", "baseline", "delta_pct", "zscore", "confidence", "severity", "arrow"]]
+        .rename(columns={"value": "Atual", "baseline": "Média temporada", "delta_pct": "Δ%", "zscore": "z",
+                         "confidence": "Confiança", "severity": "Severidade", "arrow": ""})
+        .round(2),
+        use_container_width=True, hide_index=True,
+    )
 
-if not value_vars:
-    st.info("Não há dados suficientes dessa métrica para plotar.")
-else:
-    df_melt = df_plot.melt(
-        id_vars="date",
-        value_vars=value_vars,
-        var_name="Série",
-        value_name="Valor"  # agora não conflita com nenhuma coluna existente
+if st.toggle("Escanear a liga inteira", value=False):
+    league_progress = st.progress(0)
+    league_df = match_facts.league_match_facts(
+        league["league_id"], season,
+        on_progress=lambda done, total: league_progress.progress(done / total),
     )
-    fig = px.line(df_melt, x="date", y="Valor", color="Série")
-    fig.update_layout(xaxis_title="Data", yaxis_title=plot_metric)
-    st.plotly_chart(fig, use_container_width=True)
+    league_progress.empty()
+    if league_df.empty:
+        st.info("Sem jogos finalizados na liga para esta temporada.")
+    else:
+        league_df = league_df.rename(columns={
+            "sot_for": "SOT", "shots_for": "Shots", "poss_for": "Poss%",
+            "corners_for": "Corners_for", "corners_against": "Corners_against",
+            "yellow_for": "YC_for", "red_for": "RC_for",
+        })
+        league_ranking(league_df)
 
 # ---------------------------------------------------------------------
-# 4) Tabela-base (debug opcional)
+# 5) Tabela-base (debug opcional)
 # ---------------------------------------------------------------------
 with st.expander("Ver tabela base (debug)"):
     st.dataframe(df, use_container_width=True, hide_index=True)
@@ -148,55 +148,71 @@ with st.expander("🔧 Debug da IA (resumo)", expanded=False):
         "results_seq": recent_summary["results_sequence"],
     }
     st.code(json.dumps(summary, ensure_ascii=False, indent=2))
+    # tamanho do contexto que vai no prompt (compactado para o orçamento de tokens)
+    st.code(json.dumps(ai.context_report(context), ensure_ascii=False, indent=2))
+    # tokens/latência das chamadas do processo e fração do prompt servida pelo cache do provedor
+    # (cached_tokens fica 0 enquanto o prefixo estiver abaixo do mínimo do provedor)
+    st.code(json.dumps(ai.usage_stats(), ensure_ascii=False, indent=2))
     if st.checkbox("Ver JSON bruto do contexto (truncado)"):
         raw = json.dumps(context, ensure_ascii=False, indent=2)
         st.code(raw[:4000] + ("...\n(truncado)" if len(raw)>4000 else ""))
 
 # -------------------------- renderizador de cartões -------------------
+def render_card(ins):
+    with st.container(border=True):
+        st.caption(ins.get("type","insight"))
+        st.subheader(ins.get("title","(sem título)"))
+        st.write(ins.get("summary",""))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Por que importa**")
+            st.write(ins.get("why_it_matters",""))
+        with col2:
+            st.write("**Ação sugerida**")
+            st.write(ins.get("recommended_action",""))
+        ev = ins.get("evidence") or []
+        if ev:
+            st.markdown("**Evidências**")
+            for e in ev:
+                lbl = e.get("label","-"); val = e.get("value","-")
+                base = e.get("baseline"); unit = e.get("unit","")
+                st.markdown(f"- **{lbl}**: {val}{unit}" + (f" • baseline: {base}" if base is not None else ""))
+        meta=[]
+        if ins.get("severity"): meta.append(f"Severidade: {ins['severity']}")
+        if ins.get("confidence") is not None: meta.append(f"Conf.: {ins['confidence']}")
+        if ins.get("timeframe"): meta.append(f"Janela: {ins['timeframe']}")
+        if meta: st.caption(" • ".join(meta))
+
 def render_cards(cards):
     for ins in cards:
-        with st.container(border=True):
-            st.caption(ins.get("type","insight"))
-            st.subheader(ins.get("title","(sem título)"))
-            st.write(ins.get("summary",""))
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write("**Por que importa**")
-                st.write(ins.get("why_it_matters",""))
-            with col2:
-                st.write("**Ação sugerida**")
-                st.write(ins.get("recommended_action",""))
-            ev = ins.get("evidence") or []
-            if ev:
-                st.markdown("**Evidências**")
-                for e in ev:
-                    lbl = e.get("label","-"); val = e.get("value","-")
-                    base = e.get("baseline"); unit = e.get("unit","")
-                    st.markdown(f"- **{lbl}**: {val}{unit}" + (f" • baseline: {base}" if base is not None else ""))
-            meta=[]
-            if ins.get("severity"): meta.append(f"Severidade: {ins['severity']}")
-            if ins.get("confidence") is not None: meta.append(f"Conf.: {ins['confidence']}")
-            if ins.get("timeframe"): meta.append(f"Janela: {ins['timeframe']}")
-            if meta: st.caption(" • ".join(meta))
+        render_card(ins)
 
 # --------------------------- insights automáticos ---------------------
 st.subheader("⚡ Insights automáticos")
-if st.button("🔁 Regerar insights automáticos"):
+regen = st.button("🔁 Regerar insights automáticos")
+if regen:
     st.session_state.pop("auto_cards", None)
 
 if "auto_cards" not in st.session_state:
+    # stream: cada cartão aparece assim que fica pronto
+    streamed = []
     try:
         with st.spinner("Gerando insights…"):
-            st.session_state["auto_cards"] = ai.generate_insights(context, mode="auto", max_cards=6)
+            # mesmo contexto já visto (outra sessão/worker) sai do cache em disco; regerar ignora o cache
+            for card in ai.generate_insights_stream(context, mode="auto", max_cards=6, refresh=regen):
+                render_card(card)
+                streamed.append(card)
     except ai.AIError as e:
-        st.session_state["auto_cards"] = []
         st.error(f"Falha na IA: {e}")
-
-cards = st.session_state.get("auto_cards") or []
-if not cards:
-    st.info("A IA não retornou insights automáticos para o contexto atual.")
+    st.session_state["auto_cards"] = streamed
+    if not streamed:
+        st.info("A IA não retornou insights automáticos para o contexto atual.")
 else:
-    render_cards(cards)
+    cards = st.session_state.get("auto_cards") or []
+    if not cards:
+        st.info("A IA não retornou insights automáticos para o contexto atual.")
+    else:
+        render_cards(cards)
 
 st.markdown("---")
 
@@ -212,16 +228,18 @@ if st.button("Perguntar agora") and user_prompt.strip():
     ask_ctx = dict(context)
     ask_ctx["mode"] = "freeform"
     ask_ctx["user_focus"] = user_prompt.strip()
+    st.markdown("### 📋 Resposta da IA")
+    qa = []
     try:
-        with st.spinner("Gerando resposta…"):
-            qa = ai.generate_insights(ask_ctx, mode="freeform", max_cards=4)
+        for card in ai.generate_insights_stream(ask_ctx, mode="freeform", max_cards=4):
+            render_card(card)
+            qa.append(card)
         if qa:
             st.session_state["qa_cards"] = qa
         else:
             st.info("A IA não retornou resposta para esse prompt.")
     except ai.AIError as e:
         st.error(f"Falha na IA: {e}")
-
-if "qa_cards" in st.session_state:
+elif "qa_cards" in st.session_state:
     st.markdown("### 📋 Resposta da IA")
     render_cards(st.session_state["qa_cards"])
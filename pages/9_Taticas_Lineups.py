@@ -39,8 +39,15 @@ progress = st.progress(0)
 
 OUR_ID = team["team_id"]
 
-for i, fx in enumerate(fixtures, start=1):
-    progress.progress(i / len(fixtures))
+# lineups + eventos só de jogos já disputados, todos em paralelo
+played = [fx for fx in fixtures if fx["goals"]["home"] is not None]
+details = api_client.fixtures_details(
+    [fx["fixture"]["id"] for fx in played],
+    kinds=("lineups", "events"),
+    on_progress=lambda done, total: progress.progress(done / total),
+)
+
+for fx in played:
     fid = fx["fixture"]["id"]
     goals = fx["goals"]
 
@@ -55,10 +62,7 @@ for i, fx in enumerate(fixtures, start=1):
         else:
             res = "D"
 
-    try:
-        lineups = api_client.fixture_lineups(fid)
-    except Exception:
-        lineups = []
+    lineups = details[fid].get("lineups") or []
 
     # encontra lineup do Coxa
     lineup_block = None
@@ -82,7 +86,7 @@ for i, fx in enumerate(fixtures, start=1):
     })
 
     # processa substituições
-    events = api_client.fixture_events(fid)
+    events = details[fid].get("events") or []
     for ev in events or []:
         if ev.get("type") == "subst":
             tid = (ev.get("team") or {}).get("id")